@@ -0,0 +1,117 @@
+import numpy as np
+
+# --- ДЕРЕВО БАРНСА-ХАТА (КВАДРОДЕРЕВО) ---
+# Вузол зберігає центр мас, сумарну масу і половину сторони квадрата.
+# Під час обходу вузол приймається цілком, якщо сторона / dist < theta
+# (і ціль не лежить усередині вузла), інакше спускаємося до дітей.
+# Обхід векторизований по цілях: у стеку пари (вузол, індекси цілей),
+# тож кількість ітерацій Python ~ кількості вузлів, а не цілей.
+LEAF_SIZE = 8
+MAX_DEPTH = 32
+
+
+class QuadTree:
+    def __init__(self, positions, masses, leaf_size=LEAF_SIZE):
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.masses = np.asarray(masses, dtype=np.float64).reshape(-1)
+        self.leaf_size = leaf_size
+        self.centers = []
+        self.half_sizes = []
+        self.com = []
+        self.mass = []
+        self.children = []
+        self.bodies = []
+        if len(self.masses):
+            lo = self.positions.min(axis=0)
+            hi = self.positions.max(axis=0)
+            half = max(float((hi - lo).max()) / 2, 1e-6) * 1.0001
+            self._build(np.arange(len(self.masses)), (lo + hi) / 2, half, 0)
+        self.com = np.array(self.com).reshape(-1, 2)
+        self.mass = np.array(self.mass)
+        self.centers = np.array(self.centers).reshape(-1, 2)
+        self.half_sizes = np.array(self.half_sizes)
+
+    def _build(self, idx, center, half, depth):
+        node = len(self.mass)
+        m = self.masses[idx]
+        total = m.sum()
+        pts = self.positions[idx]
+        com = (pts * m[:, None]).sum(axis=0) / total if total > 0 else pts.mean(axis=0)
+        self.centers.append(center)
+        self.half_sizes.append(half)
+        self.com.append(com)
+        self.mass.append(total)
+        self.children.append(())
+        self.bodies.append(None)
+
+        if len(idx) <= self.leaf_size or depth >= MAX_DEPTH:
+            self.bodies[node] = idx
+            return node
+
+        right = pts[:, 0] >= center[0]
+        down = pts[:, 1] >= center[1]
+        quarter = half / 2
+        kids = []
+        for qx in (False, True):
+            for qy in (False, True):
+                sel = idx[(right == qx) & (down == qy)]
+                if len(sel):
+                    offset = np.array([quarter if qx else -quarter, quarter if qy else -quarter])
+                    kids.append(self._build(sel, center + offset, quarter, depth + 1))
+        self.children[node] = tuple(kids)
+        return node
+
+    # Прискорення в точках targets: g * m * diff / (dist^2 + eps^2)^(3/2)
+    # Збіг позицій (dist == 0) не дає внеску — так виключається самодія.
+    def accelerations(self, targets, theta=0.5, g=1.0, softening=0.0):
+        targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+        n = len(targets)
+        ax, ay = np.zeros(n), np.zeros(n)
+        if not len(self.mass) or not n:
+            return np.column_stack((ax, ay))
+        tx = np.ascontiguousarray(targets[:, 0])
+        ty = np.ascontiguousarray(targets[:, 1])
+        eps2 = softening ** 2
+        # При theta <= 1/sqrt(2) ціль усередині вузла ніколи не проходить
+        # критерій відкриття, тож окрема перевірка "усередині" не потрібна
+        check_inside = theta > 0.5 ** 0.5
+        stack = [(0, np.arange(n))]
+        while stack:
+            node, idx = stack.pop()
+            bodies = self.bodies[node]
+            px, py = tx[idx], ty[idx]
+
+            if bodies is not None:
+                bx = self.positions[bodies, 0][None, :]
+                by = self.positions[bodies, 1][None, :]
+                dx = bx - px[:, None]
+                dy = by - py[:, None]
+                r2 = dx * dx + dy * dy
+                with np.errstate(divide="ignore"):
+                    w = (r2 + eps2) ** -1.5
+                w[r2 == 0] = 0.0
+                w *= g * self.masses[bodies][None, :]
+                ax[idx] += (w * dx).sum(axis=1)
+                ay[idx] += (w * dy).sum(axis=1)
+                continue
+
+            cx, cy = self.com[node]
+            dx = cx - px
+            dy = cy - py
+            r2 = dx * dx + dy * dy
+            opening = 2 * self.half_sizes[node] / theta if theta > 0 else np.inf
+            far = r2 > opening * opening
+            if check_inside:
+                ox, oy = self.centers[node]
+                h = self.half_sizes[node]
+                far &= (np.abs(px - ox) > h) | (np.abs(py - oy) > h)
+            if far.any():
+                w = g * self.mass[node] * (r2[far] + eps2) ** -1.5
+                hit = idx[far]
+                ax[hit] += dx[far] * w
+                ay[hit] += dy[far] * w
+                idx = idx[~far]
+            if len(idx):
+                for child in self.children[node]:
+                    stack.append((child, idx))
+        return np.column_stack((ax, ay))
@@ -0,0 +1,306 @@
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+import headless
+from renderer import PygameRenderer
+from world import VARIANTS
+
+# --- БЕНЧМАРК КАДРУ ТА ФІЗИКИ ---
+# Кожен сценарій запускається в окремому процесі (кеші, пул пам'яті numpy і
+# імпорти одного сценарію не впливають на інший), з фіксованим зерном random
+# і np.random.
+# Для кожного етапу кадру рахується середній і p95 час (мс/кадр),
+# кроків фізики за секунду, пікова пам'ять (tracemalloc, окремий прохід,
+# щоб не спотворювати час) і результат пишеться в JSON.
+#   python benchmark.py                          # усі сценарії, обидві версії
+#   python benchmark.py --scenarios 1bh_10k merge_4 --output bench.json
+#   python benchmark.py --compare old_bench.json
+# Окремо міряється холодний старт (COLD_START): час нового процесу до
+# першого результату проти бюджету COLD_START_BUDGET_MS.
+
+# Етап -> виклик на світі з рендерером (імена — як у попередніх результатах, для --compare)
+STAGES = {
+    "draw_black_hole": lambda sim: sim.renderer.black_holes(sim, sim.screen),
+    "update_objects": lambda sim: sim.step(),
+    "draw_objects": lambda sim: sim.renderer.particles(sim, sim.screen),
+    "draw_rare_noise_stars": lambda sim: sim.renderer.stars(sim, sim.screen),
+    "draw_light_distortion": lambda sim: sim.renderer.distortion(sim, sim.screen),
+}
+DEFAULT_FRAMES = 200
+MEMORY_FRAMES = 20
+
+# --- ХОЛОДНИЙ СТАРТ ---
+# Пакетні прогони запускають тисячі коротких процесів, тож важить і запуск.
+# Кожен замір — новий інтерпретатор, береться найкращий з --cold-start-runs;
+# від нього віднімається порожній "python -c pass", тож бюджет — це накладні
+# витрати самої симуляції (імпорти, таблиці, перший крок / кадр).
+#   import        — імпорт ядра (world.py);
+#   headless_step — headless.py на один крок без рендерингу;
+#   first_frame   — headless.py на один крок з рендерингом.
+COLD_START = {
+    "import": ["-c", "import world"],
+    "headless_step": ["headless.py", "--steps", "1"],
+    "first_frame": ["headless.py", "--steps", "1", "--render"],
+}
+COLD_START_BUDGET_MS = {"import": 150, "headless_step": 250, "first_frame": 450}
+COLD_START_RUNS = 5
+
+
+def _make_black_hole(sim, pos, vel, scale=0.7):
+    return {
+        "center": np.array(pos, dtype=float),
+        "radius": sim.BLACK_HOLE_RADIUS * scale,
+        "gravity": sim.GRAVITY_CONSTANT * 0.8,
+        "vel": np.array(vel, dtype=float),
+        "mass": sim.BLACK_HOLE_RADIUS * scale * sim.BH_MASS_MULTIPLIER,
+        "disk_angle": 0.0,
+    }
+
+
+def _add_orbiting_objects(sim, count, rng):
+    cx, cy = sim.CENTER
+    r = rng.uniform(150, 420, count)
+    phi = rng.uniform(0, 2 * math.pi, count)
+    pos = np.column_stack((cx + r * np.cos(phi), cy + r * np.sin(phi)))
+    speed = rng.uniform(1.5, 3.0, count)
+    vel = np.column_stack((-np.sin(phi), np.cos(phi))) * speed[:, None]
+    radius = rng.uniform(2, 4, count)
+    sim.objects.append(pos, vel, radius * 2, radius, (100, 150, 255))
+
+
+def _ring_of_black_holes(sim, count):
+    cx, cy = sim.CENTER
+    holes = []
+    for k in range(count):
+        phi = 2 * math.pi * k / count
+        pos = (cx + 300 * math.cos(phi), cy + 300 * math.sin(phi))
+        vel = (-1.2 * math.cos(phi), -1.2 * math.sin(phi))
+        holes.append(_make_black_hole(sim, pos, vel))
+    return holes
+
+
+def setup_objects(count):
+    def setup(sim, rng):
+        _add_orbiting_objects(sim, count, rng)
+    return setup
+
+
+def setup_merge(holes):
+    def setup(sim, rng):
+        sim.black_holes[:] = _ring_of_black_holes(sim, holes)
+        _add_orbiting_objects(sim, 2000, rng)
+    return setup
+
+
+def setup_ejecta_burst(sim, rng):
+    # Чотири пари дір, що вже перекриваються: усі злиття в першому кадрі
+    sim.PARTICLE_COUNT_ON_MERGE = 2500
+    cx, cy = sim.CENTER
+    holes = []
+    for k in range(4):
+        phi = 2 * math.pi * k / 4
+        x, y = cx + 250 * math.cos(phi), cy + 250 * math.sin(phi)
+        holes.append(_make_black_hole(sim, (x - 10, y), (0, 0)))
+        holes.append(_make_black_hole(sim, (x + 10, y), (0, 0)))
+    sim.black_holes[:] = holes
+
+
+def setup_disks(count):
+    # Десятки дір різного розміру (свої спрайти й швидкості дисків), без
+    # частинок; крайні ряди — за межами екрана
+    def setup(sim, rng):
+        side = math.ceil(math.sqrt(count))
+        step = 1200 / (side - 1)
+        sim.black_holes[:] = [_make_black_hole(sim, (-150 + step * (k % side), -150 + step * (k // side)), (0, 0),
+                                               scale=0.1 + 0.4 * k / count)
+                              for k in range(count)]
+    return setup
+
+
+SCENARIOS = {
+    "1bh_1k": setup_objects(1000),
+    "1bh_10k": setup_objects(10000),
+    "1bh_100k": setup_objects(100000),
+    "merge_2": setup_merge(2),
+    "merge_4": setup_merge(4),
+    "merge_8": setup_merge(8),
+    "merge_16": setup_merge(16),
+    "ejecta_burst": setup_ejecta_burst,
+    "disks_32": setup_disks(32),
+}
+
+
+def _prepare(variant, scenario, seed):
+    sim = headless.load_simulation(variant)
+    random.seed(seed)
+    np.random.seed(seed)
+    sim.screen = pygame.Surface(sim.SCREEN_SIZE)
+    sim.renderer = PygameRenderer(sim)
+    SCENARIOS[scenario](sim, np.random.default_rng(seed))
+    return sim
+
+
+def _frame(sim, timings=None):
+    sim.screen.fill(sim.BACKGROUND_COLOR)
+    for stage, fn in STAGES.items():
+        start = time.perf_counter()
+        fn(sim)
+        if timings is not None:
+            timings[stage].append(time.perf_counter() - start)
+
+
+# --- ОДИН ВИПАДОК (виконується в дочірньому процесі) ---
+def run_case(variant, scenario, frames, seed):
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        sim = _prepare(variant, scenario, seed)
+        timings = {stage: [] for stage in STAGES}
+        start = time.perf_counter()
+        for _ in range(frames):
+            _frame(sim, timings)
+        wall = time.perf_counter() - start
+        final_objects, final_holes = len(sim.objects), len(sim.black_holes)
+
+    stages = {}
+    for stage, samples in timings.items():
+        ms = np.array(samples) * 1000
+        stages[stage] = {"mean_ms": float(ms.mean()), "p95_ms": float(np.percentile(ms, 95))}
+    physics_s = float(np.sum(timings["update_objects"]))
+
+    # Окремий прохід для пікової пам'яті
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tracemalloc.start()
+        sim = _prepare(variant, scenario, seed)
+        for _ in range(min(frames, MEMORY_FRAMES)):
+            _frame(sim)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "variant": variant,
+        "scenario": scenario,
+        "frames": frames,
+        "seed": seed,
+        "stages": stages,
+        "frame_ms": wall * 1000 / frames,
+        "steps_per_sec": frames / physics_s if physics_s > 0 else float("inf"),
+        "peak_mem_mb": peak / 2 ** 20,
+        "final_objects": final_objects,
+        "final_black_holes": final_holes,
+    }
+
+
+def _run_in_subprocess(variant, scenario, frames, seed):
+    cmd = [sys.executable, os.path.abspath(__file__), "--case", variant, scenario,
+           "--frames", str(frames), "--seed", str(seed)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _spawn_ms(args):
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + args, check=True, capture_output=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_cold_start(runs=COLD_START_RUNS):
+    baseline = min(_spawn_ms(["-c", "pass"]) for _ in range(runs))
+    cold = {"interpreter_ms": baseline}
+    for name, args in COLD_START.items():
+        ms = min(_spawn_ms(args) for _ in range(runs)) - baseline
+        cold[name] = {"ms": ms, "budget_ms": COLD_START_BUDGET_MS[name], "ok": ms <= COLD_START_BUDGET_MS[name]}
+    return cold
+
+
+def print_cold_start(cold, baseline=None):
+    print(f"Холодний старт (понад порожній інтерпретатор, {cold['interpreter_ms']:.0f} мс):")
+    for name in COLD_START:
+        r = cold[name]
+        row = f"  {name:<15}{r['ms']:>8.1f} мс  бюджет {r['budget_ms']:>5} мс  {'OK' if r['ok'] else 'ПОНАД БЮДЖЕТ'}"
+        if baseline and name in baseline:
+            row += f"  x{r['ms'] / baseline[name]['ms']:.2f} до базового"
+        print(row)
+
+
+def _environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def print_table(results, baseline=None):
+    base = {(r["variant"], r["scenario"]): r for r in (baseline or [])}
+    header = f"{'версія':<13}{'сценарій':<14}" + "".join(f"{s[:16]:>18}" for s in STAGES) + \
+             f"{'кадр, мс':>11}{'кроків/с':>11}{'пам, МБ':>10}"
+    print(header)
+    for r in results:
+        row = f"{r['variant']:<13}{r['scenario']:<14}"
+        row += "".join(f"{r['stages'][s]['mean_ms']:>18.3f}" for s in STAGES)
+        row += f"{r['frame_ms']:>11.2f}{r['steps_per_sec']:>11.1f}{r['peak_mem_mb']:>10.1f}"
+        old = base.get((r["variant"], r["scenario"]))
+        if old:
+            row += f"  x{r['frame_ms'] / old['frame_ms']:.2f} до базового"
+        print(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк симуляції чорних дір")
+    parser.add_argument("--variants", nargs="+", choices=sorted(VARIANTS), default=["main", "experimental"])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="попередній JSON для порівняння")
+    parser.add_argument("--cold-start-runs", type=int, default=COLD_START_RUNS,
+                        help="запусків на замір холодного старту (0 = не міряти)")
+    parser.add_argument("--case", nargs=2, metavar=("VARIANT", "SCENARIO"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], args.case[1], args.frames, args.seed)))
+        return 0
+
+    results = []
+    for scenario in args.scenarios:
+        for variant in args.variants:
+            results.append(_run_in_subprocess(variant, scenario, args.frames, args.seed))
+
+    cold = measure_cold_start(args.cold_start_runs) if args.cold_start_runs > 0 else None
+
+    baseline = baseline_cold = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        baseline, baseline_cold = previous["results"], previous.get("cold_start")
+    print_table(results, baseline)
+    if cold:
+        print_cold_start(cold, baseline_cold)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"environment": _environment(), "seed": args.seed, "frames": args.frames,
+                   "results": results, "cold_start": cold}, f, indent=2)
+    print(f"Результати: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
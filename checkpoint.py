@@ -0,0 +1,219 @@
+import json
+import os
+import queue
+import random
+import threading
+
+import numpy as np
+
+from particles import FIELDS
+
+# --- ЗНІМКИ СТАНУ СИМУЛЯЦІЇ (CHECKPOINT) ---
+# Один файл: MAGIC, довжина заголовка (uint64 LE), JSON-заголовок, далі сирі
+# масиви, кожен вирівняний на ALIGN байт — по одному на поле:
+#   objects.<поле ParticleStore>, bh.center / bh.vel / bh.radius / bh.gravity /
+#   bh.mass / bh.disk_angle, stars.pos / stars.depth / stars.born (увесь
+#   кільцевий буфер), rng.np_keys.
+# У заголовку — варіант, зерно й номер сесії, що записала знімок (за ними replay.py
+# шукає знімки для --seek), dtype/shape/зсув кожного масиву і дрібний стан (charging,
+# charge_time, step_count, голова кільця зірок, стан генераторів
+# random, np.random і зірок).
+# Відновлення відображає масиви у пам'ять (np.memmap, copy-on-write) замість
+# розбору, тож великий знімок відкривається миттєво, а файл лишається незмінним.
+# sim — світ World (world.py).
+MAGIC = b"BHSNAP01"
+VERSION = 5
+ALIGN = 64
+SUFFIX = ".bhsnap"
+
+
+def _aligned(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def capture_state(sim):
+    objects = sim.objects
+    arrays = {f"objects.{name}": np.array(getattr(objects, name)) for name, _, _ in FIELDS}
+    holes = sim.black_holes
+    arrays["bh.center"] = np.array([bh["center"] for bh in holes], dtype=np.float64).reshape(-1, 2)
+    arrays["bh.vel"] = np.array([bh["vel"] for bh in holes], dtype=np.float64).reshape(-1, 2)
+    for key in ("radius", "gravity", "mass", "disk_angle"):
+        arrays[f"bh.{key}"] = np.array([bh[key] for bh in holes], dtype=np.float64)
+    stars = sim.star_field
+    arrays["stars.pos"] = np.array(stars.pos)
+    arrays["stars.depth"] = np.array(stars.depth)
+    arrays["stars.born"] = np.array(stars.born)
+
+    kind, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    arrays["rng.np_keys"] = np.array(keys)
+    py_version, py_state, py_gauss = random.getstate()
+    meta = {
+        "variant": sim.variant,
+        "seed": sim.session_seed,
+        "session": sim.session_id,
+        "step": int(sim.step_count),
+        "next_uid": int(objects.next_uid),
+        "charging": bool(sim.charging),
+        "charge_time": float(sim.charge_time),
+        "rng_np": [kind, int(pos), int(has_gauss), float(cached_gaussian)],
+        "rng_py": [py_version, list(py_state), py_gauss],
+        "stars": {"head": stars.head, "count": stars.count, "step": stars.step},
+        "rng_star": stars.rng.bit_generator.state,
+    }
+    return {"meta": meta, "arrays": arrays}
+
+
+def write_state(path, state):
+    arrays = state["arrays"]
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({"version": VERSION, "meta": state["meta"], "arrays": layout}).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    # Пишемо поруч і підміняємо одним rename: обірваний запис не псує старий знімок
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return path
+
+
+def save_checkpoint(path, sim):
+    return write_state(path, capture_state(sim))
+
+
+def read_state(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: це не знімок симуляції")
+        size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(size).decode("utf-8"))
+    if header["version"] != VERSION:
+        raise ValueError(f"{path}: версія знімка {header['version']}, очікується {VERSION}")
+    data_start = _aligned(len(MAGIC) + 8 + size)
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        shape = tuple(spec["shape"])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=spec["dtype"])
+        else:
+            arrays[name] = np.memmap(path, dtype=spec["dtype"], mode="c", offset=data_start + spec["offset"],
+                                     shape=shape)
+    return {"meta": header["meta"], "arrays": arrays}
+
+
+def restore_state(sim, state):
+    meta, arrays = state["meta"], state["arrays"]
+    if meta["variant"] != sim.variant:
+        raise ValueError(f"Знімок варіанта {meta['variant']}, а світ — варіанта {sim.variant}")
+    sim.objects.load({name: arrays[f"objects.{name}"] for name, _, _ in FIELDS}, meta["next_uid"])
+
+    sim.black_holes[:] = [{
+        "center": np.array(center),
+        "radius": float(radius),
+        "gravity": float(gravity),
+        "vel": np.array(vel),
+        "mass": float(mass),
+        "disk_angle": float(disk_angle),
+    } for center, vel, radius, gravity, mass, disk_angle in zip(arrays["bh.center"], arrays["bh.vel"],
+                                                                arrays["bh.radius"], arrays["bh.gravity"],
+                                                                arrays["bh.mass"], arrays["bh.disk_angle"])]
+    sim.star_field.load({key: arrays[f"stars.{key}"] for key in ("pos", "depth", "born")}, meta["stars"])
+    sim.step_count = meta["step"]
+    sim.previous = None # Позиції до відновлення з новим станом не інтерполюються
+    sim.charging = meta["charging"]
+    sim.charge_time = meta["charge_time"]
+
+    kind, pos, has_gauss, cached_gaussian = meta["rng_np"]
+    np.random.set_state((kind, np.array(arrays["rng.np_keys"]), pos, has_gauss, cached_gaussian))
+    py_version, py_state, py_gauss = meta["rng_py"]
+    random.setstate((py_version, tuple(py_state), py_gauss))
+    sim.star_field.rng.bit_generator.state = meta["rng_star"]
+    return meta
+
+
+def load_checkpoint(path, sim):
+    return restore_state(sim, read_state(path))
+
+
+# --- ФОНОВІ АВТОЗНІМКИ ---
+# Кадр лише копіює масиви (capture_state), а запис на диск іде в окремому
+# потоці. Черга на один знімок: якщо попередній ще пишеться, новий пропускається
+# (skipped), а не гальмує цикл. Зберігаються останні keep файлів.
+# Невдалий запис не зупиняє потік: failed — скільки знімків втрачено,
+# error — остання помилка; pop_error() віддає її один раз, щоб цикл повідомив.
+class AutoCheckpoint:
+    def __init__(self, directory, every, keep=3):
+        self.directory = directory
+        self.every = every
+        self.keep = keep
+        self.skipped = 0
+        self._slot = None
+        self.written = []
+        self.failed = 0
+        self.error = None
+        self._reported = None
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._writer, name="checkpoint-writer", daemon=True)
+        os.makedirs(directory, exist_ok=True)
+        self._thread.start()
+
+    def path_for(self, step):
+        return os.path.join(self.directory, f"checkpoint_{step:08d}{SUFFIX}")
+
+    # Зберігає, щойно step_count переходить чергове кратне every: за кадр вікна
+    # минає кілька кроків фізики, тож саме кратне може й не трапитись
+    def maybe_save(self, sim):
+        step = sim.step_count
+        if self.every <= 0:
+            return False
+        slot = step // self.every
+        if self._slot is None:
+            self._slot = (step - 1) // self.every
+        previous, self._slot = self._slot, slot
+        if slot <= previous:
+            return False
+        # Черга зайнята — пропуск ще до копіювання масивів: саме в такі кадри
+        # запис і так відстає. Кладе в чергу лише цей потік, тож місце не зникне
+        if self._queue.full():
+            self.skipped += 1
+            return False
+        self._queue.put_nowait((self.path_for(step), capture_state(sim)))
+        return True
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, state = item
+                write_state(path, state)
+                self.written.append(path)
+                while len(self.written) > self.keep:
+                    os.remove(self.written.pop(0))
+            except Exception as exc:
+                self.failed += 1
+                self.error = exc
+            finally:
+                self._queue.task_done()
+
+    def pop_error(self):
+        error = self.error
+        if error is self._reported:
+            return None
+        self._reported = error
+        return error
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
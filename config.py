@@ -0,0 +1,256 @@
+import os
+import time
+
+from integrators import INTEGRATORS
+from starfield import StarField
+
+# --- ПРОФІЛІ ПАРАМЕТРІВ І ГАРЯЧЕ ОНОВЛЕННЯ ---
+# Профіль — TOML-файл з параметрами фізики й рендерингу (імена — як параметри
+# World у world.py, регістр неважливий). Ключі верхнього рівня — спільна основа,
+# таблиці — іменовані профілі поверх неї:
+#   GRAVITY_CONSTANT = 15000
+#   [dense_stars]
+#   STAR_SPAWN_RATE = 300
+#   MAX_STARS = 50000
+# Типи задані в PHYSICS / RENDER; значення перевіряються і приводяться до них,
+# а числа ще й на межі LIMITS (нуль кадрів за секунду чи порожній буфер зірок
+# ламали б цикл і перебудову кешів).
+# apply_profile() записує змінені значення у світ і перебудовує лише ті кеші,
+# параметри яких змінились: світу (CACHES — зоряне тло, пул процесів) і
+# рендерера (renderer.invalidate() — вигин світла, спрайти дір).
+# ProfileWatcher раз на interval секунд перевіряє mtime файла і застосовує
+# зміни до запущеної симуляції; ключ, прибраний з файла, повертається до
+# значення за замовчуванням. Файл з помилкою не ламає прогін — лишається попередній
+# профіль.
+COLOR = "color"
+
+PHYSICS = {
+    "BLACK_HOLE_RADIUS": float,
+    "GRAVITY_CONSTANT": float,
+    "EVAPORATION_RATE": float,
+    "BH_MASS_MULTIPLIER": float,
+    "MAX_CHARGE": float,
+    "MAX_CHARGE_FOR_BH": float,
+    "PARTICLE_COUNT_ON_MERGE": int,
+    "BH_GRAVITY_FACTOR": float,
+    "BH_THETA": float,
+    "OBJECT_SELF_GRAVITY": bool,
+    "OBJECT_GRAVITY_THETA": float,
+    "OBJECT_GRAVITY_SOFTENING": float,
+    "INTEGRATOR": INTEGRATORS,
+    "FORCE_SOFTENING": float,
+    "PHYSICS_WORKERS": int,
+    "BH_SPAWN_SPEED": float,
+    "PHYSICS_HZ": float,
+    "MAX_PHYSICS_STEPS": int,
+}
+
+RENDER = {
+    "FPS": int,
+    "BACKGROUND_COLOR": COLOR,
+    "ACCRETION_COLOR": COLOR,
+    "SPHERE_COLOR": COLOR,
+    "GRAVITY_RADIUS": float,
+    "LIGHT_BEND_INTENSITY": float,
+    "DISTORTION_STEP": int,
+    "ISCO_RADIUS_FACTOR": float,
+    "ISCO_COLOR": COLOR,
+    "DOPPLER_FACTOR": float,
+    "DISK_ROTATION_SPEED": float,
+    "STAR_SPAWN_RATE": float,
+    "MAX_STARS": int,
+    "STAR_LIFETIME": int,
+    "STAR_COLOR": COLOR,
+    "STAR_FADE": int,
+    "STAR_PARALLAX": float,
+}
+
+FIELDS = {**PHYSICS, **RENDER}
+
+# (мінімум, максимум) включно; None — без верхньої межі
+LIMITS = {
+    "BLACK_HOLE_RADIUS": (1, 450),
+    "GRAVITY_CONSTANT": (0, None),
+    "EVAPORATION_RATE": (0, 1),
+    "BH_MASS_MULTIPLIER": (1, None),
+    "MAX_CHARGE": (1, None),
+    "MAX_CHARGE_FOR_BH": (1, None),
+    "PARTICLE_COUNT_ON_MERGE": (0, 100000),
+    "BH_GRAVITY_FACTOR": (0, None),
+    "BH_THETA": (0, 2),
+    "OBJECT_GRAVITY_THETA": (0, 2),
+    "OBJECT_GRAVITY_SOFTENING": (0, None),
+    "FORCE_SOFTENING": (0, None),
+    "PHYSICS_WORKERS": (0, 256),
+    "BH_SPAWN_SPEED": (0, None),
+    "PHYSICS_HZ": (1, 10000),
+    "MAX_PHYSICS_STEPS": (1, 1000),
+    "FPS": (1, 1000),
+    "GRAVITY_RADIUS": (1, None),
+    "LIGHT_BEND_INTENSITY": (0, None),
+    "DISTORTION_STEP": (1, 64),
+    "ISCO_RADIUS_FACTOR": (1, 10),
+    "DOPPLER_FACTOR": (0, 1),
+    "STAR_SPAWN_RATE": (0, None),
+    "MAX_STARS": (1, 10000000),
+    "STAR_LIFETIME": (1, None),
+    "STAR_FADE": (0, None),
+    "STAR_PARALLAX": (0, 1),
+}
+
+
+def _parallel_stepper(sim):
+    if sim.parallel_stepper is not None:
+        sim.parallel_stepper.close()
+    sim.parallel_stepper = None
+    if sim.PHYSICS_WORKERS:
+        from parallel import ParallelStepper
+        sim.parallel_stepper = ParallelStepper(sim.PHYSICS_WORKERS)
+
+
+# Тло не скидається: параметри міняються на місці, а при новій ємності
+# найновіші зірки переносяться в новий буфер (генератор і лічильник кроків ті самі)
+def _star_field(sim):
+    field = sim.star_field
+    if sim.MAX_STARS != field.capacity:
+        live = field._live()[-sim.MAX_STARS:]
+        k = len(live)
+        resized = StarField(sim.MAX_STARS, field.size, 0, 0)
+        resized.pos[:k], resized.depth[:k], resized.born[:k] = field.pos[live], field.depth[live], field.born[live]
+        resized.head, resized.count, resized.step = k % sim.MAX_STARS, k, field.step
+        resized.rng = field.rng
+        sim.star_field = field = resized
+    field.spawn_rate = sim.STAR_SPAWN_RATE
+    field.lifetime = sim.STAR_LIFETIME
+    field.fade = sim.STAR_FADE
+    field.parallax = sim.STAR_PARALLAX
+
+
+def _initial_bh_mass(sim):
+    sim.INITIAL_BH_MASS = sim.BLACK_HOLE_RADIUS * sim.BH_MASS_MULTIPLIER
+
+
+# (параметри, перебудова): виконується, якщо змінився хоч один з параметрів
+CACHES = (
+    (("PHYSICS_WORKERS",), _parallel_stepper),
+    (("STAR_SPAWN_RATE", "MAX_STARS", "STAR_LIFETIME", "STAR_FADE", "STAR_PARALLAX"), _star_field),
+    (("BLACK_HOLE_RADIUS", "BH_MASS_MULTIPLIER"), _initial_bh_mass),
+)
+
+
+# --- ЧИТАННЯ Й ПЕРЕВІРКА ---
+def _coerce(name, kind, value):
+    if kind is bool:
+        if not isinstance(value, bool):
+            raise ValueError(f"{name}: очікується true/false, отримано {value!r}")
+        return value
+    if kind is int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"{name}: очікується ціле число, отримано {value!r}")
+        return value
+    if kind is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{name}: очікується число, отримано {value!r}")
+        return float(value)
+    if kind == COLOR:
+        if (not isinstance(value, (list, tuple)) or len(value) != 3
+                or not all(isinstance(c, int) and not isinstance(c, bool) and 0 <= c <= 255 for c in value)):
+            raise ValueError(f"{name}: очікується колір [r, g, b] з цілих 0..255, отримано {value!r}")
+        return tuple(value)
+    if value not in kind:
+        raise ValueError(f"{name}: очікується одне з {', '.join(kind)}, отримано {value!r}")
+    return value
+
+
+def _check_limits(name, value):
+    if name not in LIMITS:
+        return value
+    low, high = LIMITS[name]
+    if value < low or (high is not None and value > high):
+        raise ValueError(f"{name}: очікується значення в межах {low}..{'∞' if high is None else high}, "
+                         f"отримано {value!r}")
+    return value
+
+
+def validate(sim, values):
+    checked = {}
+    for key, value in values.items():
+        name = key.upper()
+        if name not in FIELDS or not hasattr(sim, name):
+            raise ValueError(f"Невідомий параметр профілю: {key}")
+        checked[name] = _check_limits(name, _coerce(name, FIELDS[name], value))
+    return checked
+
+
+# Поточні значення всіх параметрів профілю (напр. для метаданих запису)
+def current_values(sim):
+    return {name: getattr(sim, name) for name in FIELDS if hasattr(sim, name)}
+
+
+def read_profile(path, name=None):
+    import tomllib   # лише коли профіль справді задано
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    values = {key: value for key, value in data.items() if not isinstance(value, dict)}
+    if name is not None:
+        if not isinstance(data.get(name), dict):
+            raise ValueError(f"{path}: немає профілю [{name}]")
+        values.update(data[name])
+    return values
+
+
+# --- ЗАСТОСУВАННЯ ---
+# Повертає {параметр: значення} лише для тих, що справді змінились
+def apply_profile(sim, values):
+    changed = {name: value for name, value in validate(sim, values).items() if getattr(sim, name) != value}
+    for name, value in changed.items():
+        setattr(sim, name, value)
+    for names, rebuild in CACHES:
+        if any(name in changed for name in names):
+            rebuild(sim)
+    if changed and sim.renderer is not None:
+        sim.renderer.invalidate(sim, changed)
+    return changed
+
+
+def load_profile(path, sim, name=None):
+    return apply_profile(sim, read_profile(path, name))
+
+
+# --- СПОСТЕРЕЖЕННЯ ЗА ФАЙЛОМ ---
+class ProfileWatcher:
+    def __init__(self, path, name=None, interval=0.5):
+        self.path = path
+        self.name = name
+        self.interval = interval
+        self.error = None
+        self._mtime = None
+        self._checked = 0.0
+        self._defaults = None
+
+    # Викликається раз на кадр; перший виклик застосовує профіль одразу
+    def poll(self, sim):
+        now = time.monotonic()
+        if self._mtime is not None and now - self._checked < self.interval:
+            return {}
+        self._checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            self.error = e
+            return {}
+        if mtime == self._mtime:
+            return {}
+        self._mtime = mtime
+        if self._defaults is None:
+            self._defaults = current_values(sim)
+        try:
+            changed = apply_profile(sim, {**self._defaults, **validate(sim, read_profile(self.path, self.name))})
+        except (OSError, ValueError) as e:
+            self.error = e
+            print(f"Профіль {self.path} не застосовано: {e}")
+            return {}
+        self.error = None
+        if changed:
+            print("Профіль оновлено: " + ", ".join(f"{name}={value}" for name, value in changed.items()))
+        return changed
@@ -0,0 +1,70 @@
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+
+# --- ВИГИН СВІТЛА ЧЕРЕЗ ТАБЛИЦІ ЗСУВІВ ---
+# Карта зсувів залежить лише від радіуса лінзи та інтенсивності, тому
+# рахується один раз у локальних координатах (dx, dy в межах [-R, R])
+# і кешується. Коли діра рухається, карта просто зсувається до її центру,
+# а пікселі переносяться одним gather-ом на всю ділянку.
+# step=8 відтворює стару сітку вибірки, step=1 — повна роздільність.
+# Карти спільні для процесу: новий LightDistortion (зміна DISTORTION_STEP у
+# профілі, інший рендерер) не перераховує карту того самого радіуса.
+@lru_cache(maxsize=16)
+def offset_map(radius, intensity):
+    d = np.arange(-radius, radius + 1, dtype=np.float64)
+    dx, dy = np.meshgrid(d, d, indexing="ij")
+    dist = np.sqrt(dx ** 2 + dy ** 2)
+    factor = np.where(dist < radius, intensity * (1 - dist / radius), 0.0)
+    maps = (np.trunc(dx * factor * 0.05).astype(np.int32),
+            np.trunc(dy * factor * 0.05).astype(np.int32))
+    for m in maps:
+        m.flags.writeable = False
+    return maps
+
+
+class LightDistortion:
+    def __init__(self, gravity_radius, intensity, step=8):
+        self.gravity_radius = gravity_radius
+        self.intensity = intensity
+        self.step = max(1, int(step))
+
+    def offset_map(self, radius):
+        return offset_map(int(radius), self.intensity)
+
+    def clear_cache(self):
+        offset_map.cache_clear()
+
+    def apply(self, surface, black_holes):
+        if not black_holes:
+            return
+        width, height = surface.get_width(), surface.get_height()
+        step = self.step
+        radius = int(self.gravity_radius)
+        map_x, map_y = self.offset_map(radius)
+        arr = pygame.surfarray.pixels3d(surface)
+
+        for bh in black_holes:
+            cx = int(round(bh["center"][0]))
+            cy = int(round(bh["center"][1]))
+
+            # Вузли сітки вибірки, що потрапляють у квадрат лінзи
+            x0 = max(0, cx - radius)
+            y0 = max(0, cy - radius)
+            x0 += (-x0) % step
+            y0 += (-y0) % step
+            x1 = min(width, cx + radius + 1)
+            y1 = min(height, cy + radius + 1)
+            if x0 >= x1 or y0 >= y1:
+                continue
+
+            xs = np.arange(x0, x1, step)
+            ys = np.arange(y0, y1, step)
+            ox = map_x[np.ix_(xs - cx + radius, ys - cy + radius)]
+            oy = map_y[np.ix_(xs - cx + radius, ys - cy + radius)]
+            src_x = np.clip(xs[:, None] + ox, 0, width - 1)
+            src_y = np.clip(ys[None, :] + oy, 0, height - 1)
+            arr[x0:x1:step, y0:y1:step] = arr[src_x, src_y]
+        del arr
@@ -0,0 +1,506 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from config import read_profile
+from headless import load_schedule, run
+from particles import FIELDS, FLAG_EATEN
+from physics import EJECTA_COLOR, FRAGMENT_COLOR, FRAGMENT_COUNT
+from profiler import FrameProfiler
+from world import VARIANTS, World
+
+# --- АНСАМБЛЬ: K НЕЗАЛЕЖНИХ ВСЕСВІТІВ В ОДНОМУ СВІТІ ---
+# Для прогонів Монте-Карло з невеликою кількістю частинок накладні витрати
+# Python на прогін (цикли World.step() по дірах, окремі виклики NumPy на
+# кожен масив із десятків рядків) більші за саму арифметику. Ensemble тримає
+# стан K всесвітів з провідною віссю ансамблю: поля частинок — масиви (K, N, ...)
+# з тією ж розкладкою, що й ParticleStore, поля дір — (K, H, ...); живі рядки
+# всесвіту u — перші count[u] і holes[u] слотів. Один step() застосовує ті самі
+# правила, що й World.step() (рух і злиття дір, викиди, червоніння, захоплення й
+# затухання, уламки, смуга диска), одразу до всіх K всесвітів — цикли Python
+# лише по слотах дір.
+# Кожен всесвіт має власний потік випадкових чисел (SplitMix64 з ключем від
+# зерна і власним лічильником), тож всесвіт залежить лише від свого зерна і
+# сценарію — не від K і не від сусідів по ансамблю.
+# Відмінності від World: сила між дірами — пряма сума (для кількох дір дерево
+# Барнса-Хата нею і є), інтегратор — "euler" або "leapfrog", без взаємної
+# гравітації об'єктів, пулу процесів і запису траєкторій, повідомлення про
+# спавн і злиття не друкуються. Випадкові числа — не random / np.random, тож з
+# headless.py прогони збігаються статистично, а не біт у біт.
+#   python ensemble.py --universes 256 --seed 0 --steps 1000 --schedule spawns.json
+# Спавни сценарію (spawn_object, spawn_black_hole, release_charge) діють на всі
+# всесвіти одразу; universe(u) переносить стан одного всесвіту в звичайний World
+# (рендеринг, знімок стану).
+ENSEMBLE_INTEGRATORS = ("euler", "leapfrog")
+
+# Поля дір: (ім'я, тип, ширина рядка), як particles.FIELDS; атрибути — bh_<ім'я>
+HOLE_FIELDS = (
+    ("center", np.float64, 2),
+    ("vel", np.float64, 2),
+    ("radius", np.float64, None),
+    ("gravity", np.float64, None),
+    ("mass", np.float64, None),
+)
+
+# --- ПОТОКИ ВИПАДКОВИХ ЧИСЕЛ ---
+# n-те число всесвіту u — mix(key[u] + n * GOLDEN), n = 1, 2, ... (SplitMix64):
+# лічильник draws[u] зсувається рівно на кількість узятих ним чисел.
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(z):
+    z = (z ^ (z >> np.uint64(30))) * MIX_1
+    z = (z ^ (z >> np.uint64(27))) * MIX_2
+    return z ^ (z >> np.uint64(31))
+
+
+# Номер кожного елемента серед елементів того ж всесвіту (rows — за зростанням)
+def _rank(rows):
+    return np.arange(rows.size) - np.searchsorted(rows, rows)
+
+
+class Ensemble(World):
+    # seeds — список зерен (по всесвіту на зерно) або K (зерна 0..K-1);
+    # variant, params і прапорці — як у World
+    def __init__(self, seeds, variant="main", params=None, **features):
+        self._configure(variant, params, features)
+        if self.INTEGRATOR not in ENSEMBLE_INTEGRATORS:
+            raise ValueError(f"Ансамбль не підтримує інтегратор {self.INTEGRATOR}: "
+                             f"лише {', '.join(ENSEMBLE_INTEGRATORS)}")
+        if self.OBJECT_SELF_GRAVITY:
+            raise ValueError("Ансамбль не підтримує взаємну гравітацію об'єктів")
+        self.params = dict(params or {})
+        self.seed(range(seeds) if isinstance(seeds, int) else seeds)
+        k = self.size
+
+        # --- СТАНИ (перша вісь — всесвіт) ---
+        self.count = np.zeros(k, dtype=np.int64)
+        self.next_uid = np.zeros(k, dtype=np.int64)
+        self._resize(FIELDS, "", 16)
+        self.holes = np.ones(k, dtype=np.int64)
+        self._resize(HOLE_FIELDS, "bh_", 4)
+        self.bh_center[:, 0] = self.CENTER
+        self.bh_radius[:, 0] = self.BLACK_HOLE_RADIUS
+        self.bh_gravity[:, 0] = self.GRAVITY_CONSTANT
+        self.bh_mass[:, 0] = self.BLACK_HOLE_RADIUS * self.BH_MASS_MULTIPLIER
+
+        # Підсумки всесвітів (як sweep.RunMetrics у World)
+        self.merge_count = np.zeros(k, dtype=np.int64)
+        self.merge_steps = [[] for _ in range(k)]
+        self.captured = np.zeros(k, dtype=np.int64)
+        self.captured_mass = np.zeros(k)
+
+        self.charging = False
+        self.charge_time = 0
+        self.profiler = FrameProfiler()
+        self.parallel_stepper = None
+        self.step_count = 0
+        self.recorder = None
+        self.visible_objects = np.zeros(k, dtype=np.int64)
+        self.screen = None
+        self.renderer = None
+
+    def seed(self, seeds):
+        seeds = [int(seed) for seed in seeds]
+        if not seeds:
+            raise ValueError("Ансамбль без жодного всесвіту")
+        self.seeds = seeds
+        self.size = len(seeds)
+        self.keys = np.array([np.random.SeedSequence(seed).generate_state(1, np.uint64)[0] for seed in seeds])
+        self.draws = np.zeros(self.size, dtype=np.uint64)
+
+    # rows — номер всесвіту для кожного числа (за зростанням); повертає [0, 1)
+    def uniform(self, rows):
+        counter = self.draws[rows] + _rank(rows).astype(np.uint64) + np.uint64(1)
+        self.draws += np.bincount(rows, minlength=self.size).astype(np.uint64)
+        return (_mix(self.keys[rows] + counter * GOLDEN) >> np.uint64(11)) * 2.0 ** -53
+
+    # --- ЄМНІСТЬ І УЩІЛЬНЕННЯ ---
+    # Ємність (друга вісь) лише росте, удвічі, спільна для всіх всесвітів
+    def _resize(self, fields, prefix, capacity):
+        for name, dtype, width in fields:
+            old = getattr(self, prefix + name, None)
+            array = np.zeros((self.size, capacity) + ((width,) if width else ()), dtype=dtype)
+            if old is not None:
+                array[:, :old.shape[1]] = old
+            setattr(self, prefix + name, array)
+
+    def _reserve(self, fields, prefix, capacity):
+        current = getattr(self, prefix + fields[0][0]).shape[1]
+        if capacity > current:
+            while current < capacity:
+                current *= 2
+            self._resize(fields, prefix, current)
+
+    # Живі рядки (keep — маска перших n слотів) кожного всесвіту зсуваються на
+    # початок зі збереженням порядку; переставляються лише всесвіти, де хтось
+    # загинув. Повертає нові лічильники
+    def _compact(self, fields, prefix, keep):
+        n = keep.shape[1]
+        count = np.count_nonzero(keep, axis=1)
+        rows = np.flatnonzero((keep != (np.arange(n) < count[:, None])).any(axis=1))
+        if rows.size:
+            order = np.argsort(~keep[rows], axis=1, kind="stable")
+            for name, _, _ in fields:
+                array = getattr(self, prefix + name)
+                array[rows, :n] = array[rows[:, None], order]
+        return count
+
+    # Нові частинки: rows — всесвіт кожної (за зростанням); повертає їхні слоти.
+    # Службові поля скидаються, решту викликач заповнює через [rows, slots]
+    def _allocate(self, rows):
+        added = np.bincount(rows, minlength=self.size)
+        self._reserve(FIELDS, "", int((self.count + added).max()))
+        rank = _rank(rows)
+        slots = self.count[rows] + rank
+        self.initial_color[rows, slots] = 0
+        self.flags[rows, slots] = 0
+        self.eaten_timer[rows, slots] = 0
+        self.uid[rows, slots] = self.next_uid[rows] + rank
+        self.count += added
+        self.next_uid += added
+        return slots
+
+    # --- СПАВН (у кожному всесвіті, зі своїми випадковими числами) ---
+    def spawn_object(self, pos, radius):
+        rows = np.arange(self.size)
+        r = self.uniform(np.repeat(rows, 2)).reshape(-1, 2)
+        angle = r[:, 0] * (2 * np.pi)
+        speed = 1.5 + 1.5 * r[:, 1]
+        slots = self._allocate(rows)
+        self.pos[rows, slots] = pos
+        self.vel[rows, slots] = np.column_stack((np.cos(angle), np.sin(angle))) * speed[:, None]
+        self.mass[rows, slots] = float(radius * 2)
+        self.radius[rows, slots] = float(radius)
+        self.color[rows, slots] = (100, 150, 255) if radius < 15 else self.SPHERE_COLOR
+
+    def spawn_black_hole(self, pos):
+        rows = np.arange(self.size)
+        r = self.uniform(np.repeat(rows, 2)).reshape(-1, 2)
+        slots = self.holes.copy()
+        self._reserve(HOLE_FIELDS, "bh_", int(slots.max()) + 1)
+        self.bh_center[rows, slots] = pos
+        self.bh_vel[rows, slots] = (2 * r - 1) * self.BH_SPAWN_SPEED
+        self.bh_radius[rows, slots] = self.BLACK_HOLE_RADIUS * 0.7
+        self.bh_gravity[rows, slots] = self.GRAVITY_CONSTANT * 0.8
+        self.bh_mass[rows, slots] = self.BLACK_HOLE_RADIUS * 0.7 * self.BH_MASS_MULTIPLIER
+        self.holes += 1
+
+    # --- КРОК ФІЗИКИ ---
+    def step(self):
+        profiler = self.profiler
+        merges = self._step_black_holes()
+        profiler.count("merges", merges)
+        visible = self._step_objects()
+        profiler.count("fragments", int((self.count - visible).sum()))
+        profiler.gauge("objects", int(self.count.sum()))
+        profiler.gauge("black_holes", int(self.holes.sum()))
+        self.step_count += 1
+        self.visible_objects = visible
+
+    def _hole_live(self):
+        return np.arange(self.bh_mass.shape[1]) < self.holes[:, None]
+
+    # --- ЧОРНІ ДІРИ: СИЛИ, РУХ, ЗЛИТТЯ ---
+    # g * m * diff / (dist^2 + eps^2)^(3/2) по всіх парах (K, h, h) перших h
+    # слотів; збіг позицій не дає внеску, як у QuadTree.accelerations
+    def _hole_accelerations(self, center, mass, live, g):
+        if center.shape[1] < 2:
+            return np.zeros_like(center)
+        diff = center[:, None, :, :] - center[:, :, None, :]
+        r2 = np.einsum("kijc,kijc->kij", diff, diff)
+        with np.errstate(divide="ignore"):
+            w = (r2 + self.FORCE_SOFTENING ** 2) ** -1.5
+        w[r2 == 0] = 0.0
+        w *= g * np.where(live, mass, 0.0)[:, None, :]
+        w *= live[:, :, None]
+        return np.einsum("kij,kijc->kic", w, diff)
+
+    def _step_black_holes(self):
+        live = self._hole_live()
+        h = int(self.holes.max())
+        g = self.GRAVITY_CONSTANT * self.BH_GRAVITY_FACTOR
+        vel, center, mass = self.bh_vel[:, :h], self.bh_center[:, :h], self.bh_mass[:, :h]
+        if self.INTEGRATOR == "euler":
+            vel += self._hole_accelerations(center, mass, live[:, :h], g)
+            center += vel
+        else:
+            vel += self._hole_accelerations(center, mass, live[:, :h], g) / 2
+            center += vel
+            vel += self._hole_accelerations(center, mass, live[:, :h], g) / 2
+        return self._merge_black_holes(live)
+
+    # Той самий порядок, що й physics.merge_black_holes: діра i по черзі
+    # поглинає j > i з уже оновленими центром і радіусом — пара (i, j)
+    # перевіряється для всіх всесвітів разом. Повертає кількість злиттів.
+    def _merge_black_holes(self, live):
+        center, vel, radius, mass = self.bh_center, self.bh_vel, self.bh_radius, self.bh_mass
+        h = int(self.holes.max())
+        if h < 2:
+            return 0
+        # Жодна пара ще не близько — проходу по парах не треба
+        diff = center[:, None, :h] - center[:, :h, None]
+        close = np.hypot(diff[..., 0], diff[..., 1]) < (radius[:, :h, None] + radius[:, None, :h]) * 0.8
+        close &= live[:, :h, None] & live[:, None, :h]
+        if not np.triu(close, 1).any():
+            return 0
+
+        merges = 0
+        for i in range(h - 1):
+            for j in range(i + 1, h):
+                d = np.hypot(center[:, j, 0] - center[:, i, 0], center[:, j, 1] - center[:, i, 1])
+                u = np.flatnonzero(live[:, i] & live[:, j] & (d < (radius[:, i] + radius[:, j]) * 0.8))
+                if not u.size:
+                    continue
+                m1, m2 = mass[u, i, None], mass[u, j, None]
+                total = m1 + m2
+                center[u, i] = (center[u, i] * m1 + center[u, j] * m2) / total
+                vel[u, i] = (vel[u, i] * m1 + vel[u, j] * m2) / total
+                mass[u, i] = total[:, 0]
+                radius[u, i] = (radius[u, i]**3 + radius[u, j]**3)**(1/3)
+                self.bh_gravity[u, i] = mass[u, i] / self.BH_MASS_MULTIPLIER * self.GRAVITY_CONSTANT / self.BLACK_HOLE_RADIUS
+                live[u, j] = False
+                self._ejecta(u, center[u, i])
+                self.merge_count[u] += 1
+                for k in u.tolist():
+                    self.merge_steps[k].append(self.step_count)
+                merges += u.size
+
+        self.holes = self._compact(HOLE_FIELDS, "bh_", live)
+        dead = ~self._hole_live()
+        for name, _, _ in HOLE_FIELDS:
+            getattr(self, "bh_" + name)[dead] = 0
+        return merges
+
+    # Викид енергії: PARTICLE_COUNT_ON_MERGE частинок з центру злиття
+    def _ejecta(self, universes, centers):
+        k = self.PARTICLE_COUNT_ON_MERGE
+        rows = np.repeat(universes, k)
+        r = self.uniform(np.repeat(rows, 2)).reshape(-1, 2)
+        angle = r[:, 0] * (2 * np.pi)
+        speed = 3 + 4 * r[:, 1]
+        slots = self._allocate(rows)
+        self.pos[rows, slots] = np.repeat(centers, k, axis=0)
+        self.vel[rows, slots] = np.column_stack((np.cos(angle), np.sin(angle))) * speed[:, None]
+        self.mass[rows, slots] = 2.0
+        self.radius[rows, slots] = 3.0
+        self.color[rows, slots] = EJECTA_COLOR
+
+    # --- ДАЛЬНЯ ГРАВІТАЦІЯ ВІД ДІР ---
+    # F = gravity / dist^2 * 0.1 (як integrators.far_field_force) для частинок
+    # p (M, 2) зі всесвітів rows — кожна тягнеться лише до дір свого всесвіту
+    def _far_field(self, p, rows, hole_live):
+        c = self.bh_center[rows]
+        dx = c[..., 0] - p[:, 0, None]
+        dy = c[..., 1] - p[:, 1, None]
+        d2 = dx * dx + dy * dy + self.FORCE_SOFTENING ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            w = np.where(hole_live[rows], self.bh_gravity[rows] * 0.1 / (np.sqrt(d2) * d2), 0.0)
+        return np.column_stack(((w * dx).sum(axis=1), (w * dy).sum(axis=1)))
+
+    # --- ПАКЕТНИЙ КРОК ЗВИЧАЙНИХ ОБ'ЄКТІВ ---
+    # Правила physics.step_shard / finish_step масками (K, N): діри обходяться
+    # за номером слота, частинка, яку спіймала раніша діра свого всесвіту,
+    # далі не перевіряється. Усі маски — лише по перших max(count) слотах:
+    # ємність після сплеску уламків не зменшується, а хвіст порожній.
+    # Повертає кількість рядків до малювання на всесвіт.
+    def _step_objects(self):
+        k, n = self.count.size, int(self.count.max())
+        if n == 0:
+            return self.count.copy()
+        live = np.arange(n) < self.count[:, None]
+        pos, vel, mass, radius = self.pos[:, :n], self.vel[:, :n], self.mass[:, :n], self.radius[:, :n]
+        color, initial_color = self.color[:, :n], self.initial_color[:, :n]
+        flags, eaten_timer = self.flags[:, :n], self.eaten_timer[:, :n]
+        hole_live = self._hole_live()
+
+        active = live.copy()   # ще не спрацював "break" по дірах
+        eaten = np.zeros_like(live)
+        keep = np.zeros_like(live)
+        big = radius > 5
+
+        for h in range(int(self.holes.max())):
+            r = self.bh_radius[:, h, None]
+            d = np.hypot(self.bh_center[:, h, 0, None] - pos[..., 0], self.bh_center[:, h, 1, None] - pos[..., 1])
+            cand = active & hole_live[:, h, None] & (d <= r * 1.5)
+            if not cand.any():
+                continue
+            in_ring = d > r
+
+            # --- УМОВА 1: КРИТИЧНА ЗОНА (Розділення/Втеча) ---
+            critical = cand & in_ring
+            broken = critical & big
+            eaten |= broken
+            active &= ~broken
+
+            redden = np.nonzero(critical & ~big)
+            if redden[0].size:
+                rr = r[redden[0], 0]
+                fade_factor = 1.0 - (d[redden] - rr) / (rr * 0.5)
+                c = color[redden].astype(np.float64)
+                c[:, 0] = np.maximum((255 * fade_factor).astype(np.int64), 80)
+                c[:, 1] *= 1.0 - fade_factor * 0.3
+                c[:, 2] *= 1.0 - fade_factor * 0.3
+                color[redden] = c.astype(np.uint8)
+
+            # --- УМОВА 2: ПЕРЕТИН ГОРИЗОНТУ ---
+            horizon = cand & ~in_ring
+            if horizon.any():
+                eaten |= horizon
+                first = np.nonzero(horizon & ((flags & FLAG_EATEN) == 0))
+                flags[first] |= FLAG_EATEN
+                eaten_timer[first] = 0
+                initial_color[first] = color[first]
+                self.captured += np.bincount(first[0], minlength=k)
+                self.captured_mass += np.bincount(first[0], mass[first], minlength=k)
+                eaten_timer[horizon] += 1
+
+                max_fade_frames = 30 / np.maximum(0.1, self.bh_mass[:, h] / self.INITIAL_BH_MASS)
+                finished = horizon & (eaten_timer >= max_fade_frames[:, None])
+                active &= ~finished
+
+                fading = np.nonzero(horizon & ~finished)
+                fade = 1.0 - eaten_timer[fading] / max_fade_frames[fading[0]]
+                c = initial_color[fading].astype(np.float64)
+                c[:, 0] = c[:, 0] * fade + 255 * (1 - fade)
+                c[:, 1:] *= (fade * 0.5)[:, None]
+                color[fading] = c.astype(np.uint8)
+                keep[fading] = True
+
+        tiny = radius < 1
+        moving = live & ~eaten & ~tiny
+        rows, slots = np.nonzero(moving)
+        if rows.size:
+            p, v = pos[rows, slots], vel[rows, slots]
+            if self.INTEGRATOR == "euler":
+                v += self._far_field(p, rows, hole_live)
+                p += v
+            else:
+                v += self._far_field(p, rows, hole_live) / 2
+                p += v
+                v += self._far_field(p, rows, hole_live) / 2
+            pos[rows, slots] = p
+            vel[rows, slots] = v
+        radius[moving] -= self.EVAPORATION_RATE
+        keep |= moving
+
+        # --- ВЗАЄМОДІЯ З ДИСКОМ (Яскравість/Темніння) ---
+        if self.disk_band:
+            rows, slots = np.nonzero(moving & (self.holes > 0)[:, None])
+            d = np.hypot(self.bh_center[rows, 0, 0] - pos[rows, slots, 0],
+                         self.bh_center[rows, 0, 1] - pos[rows, slots, 1])
+            r1 = self.bh_radius[rows, 0] + 40
+            r2 = self.bh_radius[rows, 0] + 110
+            band = (r1 < d) & (d < r2)
+            rows, slots, d, r1, r2 = rows[band], slots[band], d[band], r1[band], r2[band]
+            if rows.size:
+                flash = self.uniform(rows) < 0.3
+                color[rows[flash], slots[flash]] = (255, 255, 255)
+                dim = (rows[~flash], slots[~flash])
+                fade = 0.5 + 0.5 * (d[~flash] - r1[~flash]) / (r2[~flash] - r1[~flash])
+                color[dim] = (color[dim] * fade[:, None]).astype(np.uint8)
+
+        # --- РОЗДІЛЕННЯ НА УЛАМКИ ---
+        parents = np.nonzero(eaten & ~tiny & big)
+        parent_pos = pos[parents]
+        parent_mass = mass[parents] / 2
+        parent_radius = radius[parents] * 0.4 - self.EVAPORATION_RATE
+        del pos, vel, mass, radius, color, initial_color, flags, eaten_timer
+
+        self.count = self._compact(FIELDS, "", keep)
+        visible = self.count.copy()
+
+        if parents[0].size:
+            rows = np.repeat(parents[0], FRAGMENT_COUNT)
+            slots = self._allocate(rows)
+            self.pos[rows, slots] = np.repeat(parent_pos, FRAGMENT_COUNT, axis=0)
+            self.mass[rows, slots] = np.repeat(parent_mass, FRAGMENT_COUNT)
+            self.radius[rows, slots] = np.repeat(parent_radius, FRAGMENT_COUNT)
+            self.color[rows, slots] = FRAGMENT_COLOR
+            # Нормальний розподіл (Бокс-Мюллер) + кожен четвертий уламок утричі швидший
+            r = self.uniform(np.repeat(rows, 3)).reshape(-1, 3)
+            rho = np.sqrt(-2 * np.log1p(-r[:, 0]))
+            angle = r[:, 1] * (2 * np.pi)
+            v = np.column_stack((np.cos(angle), np.sin(angle))) * (rho * 2)[:, None]
+            v[r[:, 2] < 0.25] *= 3
+            self.vel[rows, slots] = v
+
+        return visible
+
+    # --- ПІДСУМОК ОДНОГО ВСЕСВІТУ (ті самі ключі, що й sweep.RunMetrics) ---
+    def summary(self, u):
+        n = int(self.count[u])
+        masses = self.bh_mass[u, :self.holes[u]].tolist()
+        steps = self.merge_steps[u]
+        return {
+            "merges": int(self.merge_count[u]),
+            "first_merge_step": steps[0] if steps else -1,
+            "merge_steps": list(steps),
+            "captured_particles": int(self.captured[u]),
+            "captured_mass": float(self.captured_mass[u]),
+            "surviving_particles": int(np.count_nonzero((self.flags[u, :n] & FLAG_EATEN) == 0)),
+            "final_holes": len(masses),
+            "total_hole_mass": float(sum(masses)),
+            "hole_masses": masses,
+        }
+
+    # --- ОДИН ВСЕСВІТ ЯК ЗВИЧАЙНИЙ СВІТ ---
+    # Копія стану всесвіту u у World того ж варіанта й параметрів: його можна
+    # малювати, зберегти знімком (checkpoint.py) або крутити далі як звичайний
+    # (далі — з random / np.random, а не з потоку ансамблю)
+    def universe(self, u):
+        world = World(self.variant, self.params, **{name: getattr(self, name) for name in VARIANTS[self.variant]})
+        n = int(self.count[u])
+        world.objects.load({name: getattr(self, name)[u, :n].copy() for name, _, _ in FIELDS},
+                           int(self.next_uid[u]))
+        world.black_holes = [{
+            "center": self.bh_center[u, h].copy(),
+            "radius": float(self.bh_radius[u, h]),
+            "gravity": float(self.bh_gravity[u, h]),
+            "vel": self.bh_vel[u, h].copy(),
+            "mass": float(self.bh_mass[u, h]),
+            "disk_angle": 0.0
+        } for h in range(self.holes[u])]
+        world.step_count = self.step_count
+        world.visible_objects = int(self.visible_objects[u])
+        return world
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ансамбль незалежних всесвітів в одному векторизованому кроці")
+    parser.add_argument("--universes", type=int, default=256, help="кількість всесвітів K")
+    parser.add_argument("--seed", type=int, default=0, help="зерно першого всесвіту (решта — наступні)")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--schedule", help="JSON-сценарій спавну (як у headless.py), для всіх всесвітів")
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default="main")
+    parser.add_argument("--profile", help="TOML-профіль параметрів (config.py)")
+    parser.add_argument("--profile-name", help="іменований профіль з --profile")
+    parser.add_argument("--save", help="зберегти знімок стану одного всесвіту (.bhsnap)")
+    parser.add_argument("--universe", type=int, default=0, help="номер всесвіту для --save")
+    args = parser.parse_args(argv)
+
+    ensemble = Ensemble(range(args.seed, args.seed + args.universes), args.variant,
+                        read_profile(args.profile, args.profile_name) if args.profile else None)
+    start = time.perf_counter()
+    run(ensemble, args.steps, load_schedule(args.schedule))
+    elapsed = time.perf_counter() - start
+
+    if args.save:
+        from checkpoint import save_checkpoint
+        save_checkpoint(args.save, ensemble.universe(args.universe))
+
+    print(f"Всесвітів: {ensemble.size}, кроків: {args.steps}, час: {elapsed:.2f} с, "
+          f"{ensemble.size / max(elapsed, 1e-9):.1f} сценаріїв/с, "
+          f"{ensemble.size * args.steps / max(elapsed, 1e-9):.0f} кроків-всесвітів/с")
+    print(f"Злиттів на всесвіт: {ensemble.merge_count.mean():.2f}, "
+          f"захоплено частинок: {ensemble.captured.mean():.1f}, "
+          f"дір наприкінці: {ensemble.holes.mean():.2f}, частинок: {ensemble.count.mean():.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from checkpoint import AutoCheckpoint, load_checkpoint, save_checkpoint
+from config import current_values, read_profile
+from integrators import INTEGRATORS
+from session import new_session_id, seed_session
+from world import VARIANTS, World
+
+# --- HEADLESS-РЕЖИМ: ФІКСОВАНИЙ КРОК БЕЗ ВІКНА ---
+# Той самий крок світу (World.step(), world.py), що й у вікні, але без
+# pygame.display і без clock.tick: кроки йдуть настільки швидко, наскільки
+# дозволяє процесор. Один крок = один крок фізики інтерактивної версії (1/PHYSICS_HZ с).
+# Замість подій миші — сценарій спавну (JSON-список):
+#   [{"step": 0, "pos": [300, 450], "charge": 800},
+#    {"step": 120, "pos": [650, 450], "type": "black_hole"},
+#    {"step": 200, "pos": [450, 200], "type": "object", "radius": 25}]
+# "charge" — час утримання кнопки в мс (як у мишачому режимі);
+# або явно "type": "object" / "black_hole" (+ "radius" для об'єкта).
+# Холодний старт: pygame (разом з pkg_resources — понад 100 мс), рендерер,
+# пул процесів і запис траєкторій імпортуються лише тоді, коли їх просять
+# (--render, --workers, --record); прогін без зображення до першого кроку
+# платить лише за numpy.
+
+def load_schedule(path):
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        events = json.load(f)
+    return sorted(events, key=lambda e: e["step"])
+
+
+def apply_event(sim, event):
+    pos = tuple(event["pos"])
+    kind = event.get("type")
+    if kind == "black_hole":
+        sim.spawn_black_hole(pos)
+    elif kind == "object":
+        sim.spawn_object(pos, float(event.get("radius", 10)))
+    else:
+        sim.release_charge(pos, float(event.get("charge", 0)))
+
+
+def load_simulation(variant="main", params=None):
+    return World(variant, params)
+
+
+# Позаекранна поверхня без pygame.init(): для Surface, draw і surfarray
+# підсистеми SDL не потрібні
+def attach_renderer(sim):
+    import pygame
+    from renderer import PygameRenderer
+    sim.screen = pygame.Surface(sim.SCREEN_SIZE)
+    if sim.renderer is None:
+        sim.renderer = PygameRenderer(sim)
+
+
+def step(sim, render=False):
+    profiler, renderer, screen = sim.profiler, sim.renderer, sim.screen
+    profiler.begin_frame()
+    if render:
+        screen.fill(sim.BACKGROUND_COLOR)
+        with profiler.stage("black_holes"):
+            renderer.black_holes(sim, screen)
+    with profiler.stage("physics"):
+        sim.step()
+    if render:
+        with profiler.stage("particles"):
+            renderer.particles(sim, screen)
+        with profiler.stage("stars"):
+            renderer.stars(sim, screen)
+        with profiler.stage("distortion"):
+            renderer.distortion(sim, screen)
+    profiler.end_frame()
+
+
+# Відлік кроків — sim.step_count: після відновлення знімка події сценарію
+# з меншим кроком вважаються вже виконаними
+def run(sim, steps, schedule=(), render=False, seed=None, checkpoint=None):
+    if seed is not None:
+        seed_session(sim, seed)
+    sim.screen = None
+    if render:
+        attach_renderer(sim)
+
+    end = sim.step_count + steps
+    pending = [event for event in schedule if event["step"] >= sim.step_count]
+    while sim.step_count < end:
+        while pending and pending[0]["step"] <= sim.step_count:
+            apply_event(sim, pending.pop(0))
+        step(sim, render)
+        if checkpoint is not None:
+            checkpoint.maybe_save(sim)
+    return sim
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Симуляція чорних дір без вікна (фіксований крок)")
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default="main")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--schedule", help="JSON-сценарій спавну")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--render", action="store_true", help="малювати кадри в позаекранну поверхню")
+    parser.add_argument("--snapshot", help="зберегти останній кадр у PNG (разом з --render)")
+    parser.add_argument("--trace", help="зберегти трасування профайлера (Chrome trace JSON)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="процеси для кроку об'єктів (0 = в одному процесі); результат той самий")
+    parser.add_argument("--integrator", choices=INTEGRATORS, help="замість INTEGRATOR світу")
+    parser.add_argument("--profile", help="TOML-профіль параметрів (config.py)")
+    parser.add_argument("--profile-name", help="іменований профіль з --profile")
+    parser.add_argument("--resume", help="продовжити зі знімка стану (.bhsnap)")
+    parser.add_argument("--save", help="зберегти знімок стану після останнього кроку")
+    parser.add_argument("--checkpoint-every", type=int, default=0, help="фоновий знімок кожні N кроків")
+    parser.add_argument("--checkpoint-dir", default="checkpoints")
+    parser.add_argument("--record", help="каталог для запису траєкторій і подій")
+    parser.add_argument("--record-every", type=int, default=1, help="записувати кожен N-й крок")
+    parser.add_argument("--no-compress", action="store_true", help="чанки запису без стиснення")
+    args = parser.parse_args(argv)
+
+    # Профіль задається до створення світу — діє і на початкову діру
+    sim = load_simulation(args.variant, read_profile(args.profile, args.profile_name) if args.profile else None)
+    if args.integrator:
+        sim.INTEGRATOR = args.integrator
+    if args.workers:
+        from parallel import ParallelStepper
+        sim.parallel_stepper = ParallelStepper(args.workers)
+    seed = args.seed
+    if args.resume:
+        # Стан генераторів відновлюється зі знімка, тож --seed тут не потрібен;
+        # продовження — та сама сесія, тож і її зерно й номер беруться зі знімка
+        meta = load_checkpoint(args.resume, sim)
+        sim.session_seed, sim.session_id = meta["seed"], meta.get("session")
+        seed = None
+    else:
+        sim.session_id = new_session_id()
+    checkpoint = AutoCheckpoint(args.checkpoint_dir, args.checkpoint_every) if args.checkpoint_every else None
+    if args.record:
+        from recorder import TrajectoryRecorder
+        sim.recorder = TrajectoryRecorder(args.record, args.record_every, compress=not args.no_compress,
+                                          settings={"variant": sim.variant, "params": current_values(sim)})
+
+    start = time.perf_counter()
+    try:
+        run(sim, args.steps, load_schedule(args.schedule), args.render, seed, checkpoint)
+    finally:
+        if sim.parallel_stepper is not None:
+            sim.parallel_stepper.close()
+        if checkpoint is not None:
+            checkpoint.close()
+        if sim.recorder is not None:
+            sim.recorder.close()
+    elapsed = time.perf_counter() - start
+
+    if args.save:
+        save_checkpoint(args.save, sim)
+
+    if args.render and args.snapshot:
+        import pygame
+        pygame.image.save(sim.screen, args.snapshot)
+    if args.trace:
+        sim.profiler.export_chrome_trace(args.trace)
+
+    print(f"Кроків: {args.steps}, час: {elapsed:.2f} с, {args.steps / max(elapsed, 1e-9):.1f} кроків/с, "
+          f"об'єктів: {len(sim.objects)}, дір: {len(sim.black_holes)}")
+    if sim.recorder is not None and sim.recorder.dropped_chunks:
+        print(f"Запис не встигав: відкинуто чанків {sim.recorder.dropped_chunks}")
+    if sim.recorder is not None and sim.recorder.failed:
+        print(f"Чанків запису не записано: {sim.recorder.failed} ({sim.recorder.error})")
+    if checkpoint is not None and checkpoint.failed:
+        print(f"Автознімків не записано: {checkpoint.failed} ({checkpoint.error})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
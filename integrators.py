@@ -0,0 +1,113 @@
+import numpy as np
+
+# --- ІНТЕГРАТОРИ РУХУ ЗВИЧАЙНИХ ОБ'ЄКТІВ ---
+# Крок кадру = 1. Варіанти:
+#   "euler"    — старе правило vel += a; pos += vel (a — на початку кадру);
+#   "leapfrog" — kick-drift-kick (швидкісний Верле): пів поштовху, зсув,
+#                нова сила в новій точці, ще пів поштовху;
+#   "adaptive" — той самий leapfrog, але кожен об'єкт потрапляє в кошик
+#                рівня L і робить 2^L підкроків по 2^-L кадру. Рівень береться з
+#                відстані до найближчого горизонту, швидкості та прискорення,
+#                тож дрібні кроки дістаються лише об'єктам біля дір.
+# softening (eps) згладжує силу біля центру: g * diff / (dist^2 + eps^2)^(3/2).
+INTEGRATORS = ("euler", "leapfrog", "adaptive")
+MAX_LEVEL = 4   # до 16 підкроків на кадр
+TIMESTEP_ETA = 0.25   # частка відстані до горизонту, яку можна пройти за підкрок
+
+
+# --- ДАЛЬНЯ ГРАВІТАЦІЯ ВІД ДІР ---
+# F = gravity / dist^2 * 0.1 уздовж напрямку на діру; проміжні масиви
+# перевикористовуються для всіх дір, щоб не виділяти пам'ять на кожну.
+def far_field_force(pos, black_holes, softening=0.0):
+    n = pos.shape[0]
+    px = np.ascontiguousarray(pos[:, 0])
+    py = np.ascontiguousarray(pos[:, 1])
+    fx, fy = np.zeros(n), np.zeros(n)
+    dx, dy, d2, tmp = np.empty(n), np.empty(n), np.empty(n), np.empty(n)
+    eps2 = softening * softening
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for bh in black_holes:
+            np.subtract(bh["center"][0], px, out=dx)
+            np.subtract(bh["center"][1], py, out=dy)
+            np.multiply(dx, dx, out=d2)
+            np.multiply(dy, dy, out=tmp)
+            d2 += tmp
+            if eps2:
+                d2 += eps2
+            np.sqrt(d2, out=tmp)
+            tmp *= d2
+            np.divide(bh["gravity"] * 0.1, tmp, out=tmp)
+            dx *= tmp
+            dy *= tmp
+            fx += dx
+            fy += dy
+    return np.column_stack((fx, fy))
+
+
+def _accel(pos, black_holes, softening, extra_force):
+    a = far_field_force(pos, black_holes, softening)
+    if extra_force is not None:
+        a += extra_force
+    return a
+
+
+# Відстань до найближчого горизонту (від'ємна — всередині)
+def horizon_distance(pos, black_holes):
+    d = np.full(pos.shape[0], np.inf)
+    for bh in black_holes:
+        np.minimum(d, np.hypot(bh["center"][0] - pos[:, 0], bh["center"][1] - pos[:, 1]) - bh["radius"], out=d)
+    return d
+
+
+# Рівень кошика: dt = eta * min(dist / |v|, sqrt(dist / |a|)), L = ceil(-log2 dt)
+def timestep_levels(pos, vel, accel, black_holes, eta=TIMESTEP_ETA, max_level=MAX_LEVEL):
+    dist = np.maximum(horizon_distance(pos, black_holes), 1.0)
+    speed = np.hypot(vel[:, 0], vel[:, 1])
+    acc = np.hypot(accel[:, 0], accel[:, 1])
+    with np.errstate(divide="ignore"):
+        dt = eta * np.minimum(dist / speed, np.sqrt(dist / acc))
+        levels = np.ceil(-np.log2(dt))
+    return np.clip(levels, 0, max_level).astype(np.int64)
+
+
+def _leapfrog(pos, vel, accel, black_holes, softening, extra_force, h, substeps):
+    # Об'єкт, що за підкрок опинився за горизонтом, далі не рухається:
+    # його спіймає перевірка захоплення наступного кадру, без "проскакування"
+    alive = np.arange(pos.shape[0])
+    for _ in range(substeps):
+        p, v = pos[alive], vel[alive]
+        ef = extra_force[alive] if extra_force is not None else None
+        v += accel[alive] * (h / 2)
+        p += v * h
+        a = _accel(p, black_holes, softening, ef)
+        v += a * (h / 2)
+        pos[alive], vel[alive], accel[alive] = p, v, a
+        alive = alive[horizon_distance(p, black_holes) > 0]
+        if alive.size == 0:
+            break
+    return pos, vel
+
+
+# pos, vel — копії рухомих об'єктів (k, 2); повертає нові (pos, vel)
+def integrate(pos, vel, black_holes, integrator="euler", softening=0.0, extra_force=None):
+    if integrator not in INTEGRATORS:
+        raise ValueError(f"Невідомий інтегратор: {integrator}")
+    accel = _accel(pos, black_holes, softening, extra_force)
+    if integrator == "euler":
+        vel += accel
+        pos += vel
+        return pos, vel
+    if integrator == "leapfrog" or not black_holes:
+        v = vel + accel / 2
+        pos += v
+        vel = v + _accel(pos, black_holes, softening, extra_force) / 2
+        return pos, vel
+
+    levels = timestep_levels(pos, vel, accel, black_holes)
+    for level in np.unique(levels):
+        idx = np.flatnonzero(levels == level)
+        ef = extra_force[idx] if extra_force is not None else None
+        p, v = _leapfrog(pos[idx], vel[idx], accel[idx], black_holes, softening, ef,
+                         0.5 ** level, 2 ** int(level))
+        pos[idx], vel[idx] = p, v
+    return pos, vel
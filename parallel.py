@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+from particles import field_views
+from physics import finish_step, hole_snapshot, step_objects, step_shard
+
+# --- ПАРАЛЕЛЬНИЙ КРОК ОБ'ЄКТІВ (ПУЛ ПРОЦЕСІВ) ---
+# Масиви ParticleStore лежать у спільній пам'яті; кожен воркер бере свій
+# суцільний відрізок рядків [lo, hi) і виконує step_shard на місці, отримавши
+# знімок дір (hole_snapshot) лише для читання. Назад повертаються тільки
+# маски та індекси, а все випадкове (спалахи диска, уламки) і ущільнення
+# робить головний процес у finish_step — тому прогін з N воркерами збігається
+# з послідовним біт у біт. Злиття дір і викиди лишаються в головному процесі.
+# Малі сцени (менше MIN_SHARD об'єктів на воркер) ідуть послідовним шляхом.
+MIN_SHARD = 4096
+
+_segment = None   # (ім'я, SharedMemory, подання полів) у процесі-воркері
+
+
+# Підключення до чужого сегмента без реєстрації в resource_tracker:
+# сегментом володіє головний процес, і лише він робить unlink
+def _attach(name, capacity):
+    global _segment
+    if _segment is not None and _segment[0] == name:
+        return _segment[2]
+    if _segment is not None:
+        old = _segment[1]
+        _segment = None
+        old.close()
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+    _segment = (name, shm, field_views(shm.buf, capacity))
+    return _segment[2]
+
+
+def _step_shard(name, capacity, lo, hi, black_holes, initial_bh_mass, evaporation_rate, disk_band,
+                broadphase, extra_force, integrator, softening):
+    views = _attach(name, capacity)
+    fields = SimpleNamespace(**{key: view[lo:hi] for key, view in views.items()})
+    return step_shard(fields, black_holes, initial_bh_mass, evaporation_rate, disk_band, broadphase,
+                      extra_force, integrator, softening)
+
+
+class ParallelStepper:
+    def __init__(self, workers=None, min_shard=MIN_SHARD):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_shard = min_shard
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            # spawn: воркерам не дістаються вікно pygame і потоки батька
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    # Той самий контракт, що й physics.step_objects
+    def step_objects(self, store, black_holes, initial_bh_mass, evaporation_rate, disk_band=False,
+                     broadphase=None, extra_force=None, integrator="euler", softening=0.0, events=None):
+        n = len(store)
+        shards = min(self.workers, n // self.min_shard)
+        if shards < 2:
+            return step_objects(store, black_holes, initial_bh_mass, evaporation_rate, disk_band,
+                                broadphase, extra_force, integrator, softening, events)
+
+        store.set_shared(True)
+        snapshot = hole_snapshot(black_holes)
+        bounds = np.linspace(0, n, shards + 1).astype(int)
+        pool = self._executor()
+        futures = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            force = extra_force[lo:hi] if extra_force is not None else None
+            futures.append((lo, pool.submit(_step_shard, store.segment_name, store.capacity, lo, hi,
+                                            snapshot, initial_bh_mass, evaporation_rate, disk_band,
+                                            broadphase, force, integrator, softening)))
+        results = [(lo, future.result()) for lo, future in futures]
+        return finish_step(store, results, black_holes, evaporation_rate, events)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
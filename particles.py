@@ -0,0 +1,252 @@
+import weakref
+
+import numpy as np
+
+# --- ПРАПОРЦІ СТАНУ ЧАСТИНКИ ---
+FLAG_EATEN = 1  # частинка вже перетинала горизонт (є eaten_timer та initial_color)
+
+
+# --- РОЗКЛАДКА ПОЛІВ У ПАМ'ЯТІ ---
+# (ім'я, тип, ширина рядка); ширина None — скалярне поле.
+# Та сама розкладка використовується для спільної пам'яті: воркер, знаючи
+# лише ім'я сегмента та ємність, відтворює ті самі масиви без копіювання.
+FIELDS = (
+    ("pos", np.float64, 2),
+    ("vel", np.float64, 2),
+    ("mass", np.float64, None),
+    ("radius", np.float64, None),
+    ("color", np.uint8, 3),
+    ("initial_color", np.uint8, 3),
+    ("flags", np.uint8, None),
+    ("eaten_timer", np.int32, None),
+    ("uid", np.int64, None),   # незмінний номер частинки (для траєкторій)
+)
+FIELD_ALIGN = 64
+
+
+def _field_shape(capacity, width):
+    return (capacity, width) if width else (capacity,)
+
+
+def buffer_size(capacity):
+    total = 0
+    for _, dtype, width in FIELDS:
+        size = int(np.prod(_field_shape(capacity, width))) * np.dtype(dtype).itemsize
+        total += -(-size // FIELD_ALIGN) * FIELD_ALIGN
+    return max(total, 1)
+
+
+def field_views(buffer, capacity):
+    views, offset = {}, 0
+    for name, dtype, width in FIELDS:
+        shape = _field_shape(capacity, width)
+        views[name] = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += -(-size // FIELD_ALIGN) * FIELD_ALIGN
+    return views
+
+
+# Сегмент може ще мати живі подання NumPy (close() тоді кидає BufferError):
+# такі сегменти чекають у списку і закриваються при наступній нагоді.
+def _release_segments(segments, current=None):
+    for shm in list(segments):
+        if shm is current:
+            continue
+        try:
+            shm.close()
+        except BufferError:
+            continue
+        segments.remove(shm)
+
+
+def _unlink_segments(segments):
+    for shm in segments:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    _release_segments(segments)
+
+
+# --- СХОВИЩЕ ЧАСТИНОК (СТРУКТУРА МАСИВІВ) ---
+# Замість списку словників {"pos", "vel", "mass", "radius", "color", ...}
+# кожне поле зберігається в окремому суцільному масиві NumPy.
+# Рядки 0..count-1 — живі частинки, решта — резерв ємності.
+# shared=True кладе всі поля в один сегмент multiprocessing.shared_memory
+# (ім'я — segment_name), щоб воркери паралельного кроку працювали з тими
+# самими масивами на місці.
+class ParticleStore:
+    def __init__(self, capacity=1024, shared=False):
+        self.count = 0
+        self.next_uid = 0
+        self.shared = shared
+        self._segment = None
+        self._segments = []   # поточний сегмент і старі, ще не закриті
+        self._finalizer = weakref.finalize(self, _unlink_segments, self._segments)
+        self._allocate(max(1, int(capacity)))
+
+    def _allocate(self, capacity):
+        if self._segment is not None:
+            self._segment.unlink()
+            self._segment = None
+        if self.shared:
+            from multiprocessing import shared_memory   # лише для паралельного кроку
+            self._segment = shared_memory.SharedMemory(create=True, size=buffer_size(capacity))
+            self._segments.append(self._segment)
+            views = field_views(self._segment.buf, capacity)
+            for view in views.values():
+                view[...] = 0
+        else:
+            views = {name: np.zeros(_field_shape(capacity, width), dtype=dtype)
+                     for name, dtype, width in FIELDS}
+        for name, view in views.items():
+            setattr(self, "_" + name, view)
+
+    def _fields(self):
+        return tuple(getattr(self, "_" + name) for name, _, _ in FIELDS)
+
+    @property
+    def segment_name(self):
+        return self._segment.name if self._segment is not None else None
+
+    @property
+    def capacity(self):
+        return self._pos.shape[0]
+
+    def __len__(self):
+        return self.count
+
+    # --- ПОДАННЯ ЖИВИХ ЧАСТИНОК (без копіювання) ---
+    @property
+    def pos(self):
+        return self._pos[:self.count]
+
+    @property
+    def vel(self):
+        return self._vel[:self.count]
+
+    @property
+    def mass(self):
+        return self._mass[:self.count]
+
+    @property
+    def radius(self):
+        return self._radius[:self.count]
+
+    @property
+    def color(self):
+        return self._color[:self.count]
+
+    @property
+    def initial_color(self):
+        return self._initial_color[:self.count]
+
+    @property
+    def flags(self):
+        return self._flags[:self.count]
+
+    @property
+    def eaten_timer(self):
+        return self._eaten_timer[:self.count]
+
+    @property
+    def uid(self):
+        return self._uid[:self.count]
+
+    def reserve(self, capacity):
+        if capacity <= self.capacity:
+            return
+        new_capacity = self.capacity
+        while new_capacity < capacity:
+            new_capacity *= 2
+        self._reallocate(new_capacity)
+
+    def _reallocate(self, capacity):
+        old = self._fields()
+        self._allocate(capacity)
+        for src, dst in zip(old, self._fields()):
+            dst[:self.count] = src[:self.count]
+        del old, src, dst
+        _release_segments(self._segments, self._segment)
+
+    # Переносить поля в спільну пам'ять (або назад), зберігаючи вміст
+    def set_shared(self, shared=True):
+        if shared != self.shared:
+            self.shared = shared
+            self._reallocate(self.capacity)
+
+    def close(self):
+        self.shared = False
+        self._reallocate(self.capacity)
+
+    # --- ПУЛ СЛОТІВ ---
+    # Рядки count..capacity-1 — вільні слоти: allocate(k) видає наступні k
+    # (ємність лише росте, тож після першого сплеску викидів нових масивів
+    # не виділяється), скидає службові поля і присвоює uid. Решту полів
+    # викликач заповнює на місці через store.pos[s], store.vel[s], ...
+    def allocate(self, k):
+        self.reserve(self.count + k)
+        s = slice(self.count, self.count + k)
+        self._initial_color[s] = 0
+        self._flags[s] = 0
+        self._eaten_timer[s] = 0
+        self._uid[s] = np.arange(self.next_uid, self.next_uid + k)
+        self.next_uid += k
+        self.count += k
+        return s
+
+    # --- МАСОВЕ ДОДАВАННЯ ---
+    # pos/vel — масиви (k, 2); mass/radius — скаляр або (k,); color — (3,) або (k, 3)
+    def append(self, pos, vel, mass, radius, color):
+        pos = np.asarray(pos, dtype=np.float64).reshape(-1, 2)
+        s = self.allocate(pos.shape[0])
+        self._pos[s] = pos
+        self._vel[s] = np.reshape(vel, (-1, 2))
+        self._mass[s] = mass
+        self._radius[s] = radius
+        self._color[s] = color
+        return s
+
+    # --- УЩІЛЬНЕННЯ НА МІСЦІ ---
+    # Залишає лише рядки з keep == True. Мертві рядки в новому діапазоні
+    # [0, n) заповнюються живими з хвоста [n, count): переміщується стільки
+    # рядків, скільки загинуло, а не всі n, і вільні слоти знову стають
+    # суцільним хвостом для allocate(). Порядок живих рядків не зберігається.
+    def compact(self, keep):
+        keep = np.asarray(keep, dtype=bool)
+        n = int(np.count_nonzero(keep))
+        if n == self.count:
+            return
+        holes = np.flatnonzero(~keep[:n])
+        movers = np.flatnonzero(keep[n:]) + n
+        for field in self._fields():
+            field[holes] = field[movers]
+        self.count = n
+
+    # --- ЗАВАНТАЖЕННЯ ГОТОВИХ МАСИВІВ ---
+    # arrays — {поле: масив (count, ...)}, напр. відображені з файлу знімка.
+    # Без спільної пам'яті масиви беруться як є, без копіювання (ємність = count,
+    # перше ж додавання переїде в нові масиви); зі спільною — копіюються в сегмент.
+    # next_uid — наступний вільний номер (за замовчуванням більший за всі наявні).
+    def load(self, arrays, next_uid=None):
+        count = len(arrays["pos"])
+        if self.shared or count == 0:
+            self.count = 0
+            self._allocate(max(1, count))
+            for name, _, _ in FIELDS:
+                getattr(self, "_" + name)[:count] = arrays[name]
+            _release_segments(self._segments, self._segment)
+        else:
+            for name, dtype, width in FIELDS:
+                array = np.asarray(arrays[name], dtype=dtype)
+                if array.shape != _field_shape(count, width):
+                    raise ValueError(f"Поле {name}: форма {array.shape}, очікується {_field_shape(count, width)}")
+                setattr(self, "_" + name, array)
+        self.count = count
+        if next_uid is None:
+            next_uid = int(self._uid[:count].max()) + 1 if count else 0
+        self.next_uid = next_uid
+
+    def clear(self):
+        self.count = 0
+        self.next_uid = 0
@@ -0,0 +1,332 @@
+import numpy as np
+
+from barnes_hut import QuadTree
+from integrators import integrate
+from particles import FLAG_EATEN
+
+FRAGMENT_COUNT = 4
+FRAGMENT_COLOR = (120, 120, 255)
+EJECTA_COLOR = (255, 255, 255)
+BH_THETA = 0.5
+
+
+# --- ЧОРНІ ДІРИ: СИЛИ ТА РУХ (N-ТІЛА) ---
+# Прискорення рахує дерево Барнса-Хата по позиціях на початку кроку,
+# тож результат не залежить від порядку злиттів. Злиття — окремий прохід після руху.
+# integrator "euler" — старе vel += a; center += vel, інакше kick-drift-kick
+# (діри мало, тож окремі підкроки їм не потрібні — "adaptive" теж іде як leapfrog).
+# Повертає список злиттів (i, j) в індексах на момент злиття, як у старому циклі.
+def step_black_holes(black_holes, store, gravity_constant, bh_gravity_factor, bh_mass_multiplier,
+                     black_hole_radius, merge_particles, theta=BH_THETA, integrator="euler", softening=0.0):
+    g = gravity_constant * bh_gravity_factor
+    if integrator == "euler":
+        for bh, a in zip(black_holes, hole_accelerations(black_holes, g, theta, softening)):
+            bh["vel"] += a
+        for bh in black_holes:
+            bh["center"] += bh["vel"]
+    else:
+        for bh, a in zip(black_holes, hole_accelerations(black_holes, g, theta, softening)):
+            bh["vel"] += a / 2
+        for bh in black_holes:
+            bh["center"] += bh["vel"]
+        for bh, a in zip(black_holes, hole_accelerations(black_holes, g, theta, softening)):
+            bh["vel"] += a / 2
+
+    return merge_black_holes(black_holes, store, gravity_constant, bh_mass_multiplier,
+                             black_hole_radius, merge_particles)
+
+
+def hole_accelerations(black_holes, g, theta=BH_THETA, softening=0.0):
+    if len(black_holes) < 2:
+        return np.zeros((len(black_holes), 2))
+    centers = np.array([bh["center"] for bh in black_holes], dtype=np.float64)
+    masses = np.array([bh["mass"] for bh in black_holes], dtype=np.float64)
+    return QuadTree(centers, masses).accelerations(centers, theta, g, softening)
+
+
+# --- ЗЛИТТЯ ЧОРНИХ ДІР ---
+# Детермінований прохід: діра i по черзі поглинає всі j > i, що ближче за
+# 0.8 * (r1 + r2), у порядку зростання j і з уже оновленими центром і радіусом.
+def merge_black_holes(black_holes, store, gravity_constant, bh_mass_multiplier,
+                      black_hole_radius, merge_particles):
+    merges = []
+    if len(black_holes) < 2:
+        return merges
+    centers = np.array([bh["center"] for bh in black_holes], dtype=np.float64)
+    radii = np.array([bh["radius"] for bh in black_holes], dtype=np.float64)
+
+    i = 0
+    while i < len(black_holes):
+        bh1 = black_holes[i]
+        j = i + 1
+        while j < len(black_holes):
+            d = np.hypot(centers[j:, 0] - centers[i, 0], centers[j:, 1] - centers[i, 1])
+            hit = np.flatnonzero(d < (radii[i] + radii[j:]) * 0.8)
+            if not hit.size:
+                break
+            j += int(hit[0])
+            bh2 = black_holes[j]
+
+            total_mass = bh1["mass"] + bh2["mass"]
+            bh1["center"] = (bh1["center"] * bh1["mass"] + bh2["center"] * bh2["mass"]) / total_mass
+            bh1["vel"] = (bh1["vel"] * bh1["mass"] + bh2["vel"] * bh2["mass"]) / total_mass
+            bh1["mass"] = total_mass
+            bh1["radius"] = (bh1["radius"]**3 + bh2["radius"]**3)**(1/3)
+            bh1["gravity"] = bh1["mass"] / bh_mass_multiplier * gravity_constant / black_hole_radius
+
+            # Викид енергії: merge_particles частинок з центру злиття
+            # Пишуться прямо у вільні слоти сховища, без проміжних масивів (k, 2)
+            angles = np.random.uniform(0, 2 * np.pi, merge_particles)
+            speed_boost = np.random.uniform(3, 7, merge_particles)
+            s = store.allocate(merge_particles)
+            vel = store.vel[s]
+            np.cos(angles, out=vel[:, 0])
+            np.sin(angles, out=vel[:, 1])
+            vel *= speed_boost[:, None]
+            store.pos[s] = bh1["center"]
+            store.mass[s] = 2.0
+            store.radius[s] = 3.0
+            store.color[s] = EJECTA_COLOR
+
+            black_holes.pop(j)
+            centers = np.delete(centers, j, axis=0)
+            radii = np.delete(radii, j)
+            centers[i] = bh1["center"]
+            radii[i] = bh1["radius"]
+            merges.append((i, j))
+        i += 1
+    return merges
+
+
+# --- ВЗАЄМНА ГРАВІТАЦІЯ ЗВИЧАЙНИХ ОБ'ЄКТІВ (опційно) ---
+# Те саме дерево, але по частинках; softening гасить сингулярність,
+# коли частинки накладаються. Більші листки та theta — бо частинок тисячі.
+OBJECT_LEAF_SIZE = 32
+
+
+def object_gravity(store, g, theta=1.0, softening=5.0):
+    if len(store) < 2:
+        return np.zeros((len(store), 2))
+    tree = QuadTree(store.pos, store.mass, OBJECT_LEAF_SIZE)
+    return tree.accelerations(store.pos, theta, g, softening)
+
+
+# --- ЗНІМОК ДІР ДЛЯ ВОРКЕРІВ ---
+# Лише поля, потрібні кроку об'єктів; центри тільки для читання.
+def hole_snapshot(black_holes):
+    snapshot = []
+    for bh in black_holes:
+        center = np.array(bh["center"], dtype=np.float64)
+        center.flags.writeable = False
+        snapshot.append({"center": center, "radius": float(bh["radius"]),
+                         "gravity": float(bh["gravity"]), "mass": float(bh["mass"])})
+    return snapshot
+
+
+# --- ПАКЕТНИЙ КРОК ЗВИЧАЙНИХ ОБ'ЄКТІВ ---
+# Дальня гравітація рахується для всіх об'єктів разом, по одній дірі за раз.
+# Правила старого циклу "for bh in black_holes" (червоніння в критичній зоні,
+# затухання за горизонтом за MAX_FADE_FRAMES, розпад на уламки) застосовуються
+# масками в тому ж порядку дір, але лише до кандидатів поруч із діркою:
+# broadphase (SpatialHash) повертає об'єкти з клітинок у межах 1.5 x радіуса,
+# а для смуги диска — у межах radius + 110. Без broadphase кандидати — усі.
+# extra_force — додаткове прискорення (n, 2), напр. взаємна гравітація об'єктів.
+# Повертає кількість рядків, які треба малювати в цьому кадрі
+# (уламки, що народилися зараз, додаються після них і з'являться з наступного кадру).
+# integrator / softening — див. integrators.py ("euler" — старе правило кадру).
+# events — список, куди додаються події кадру (kind, дані), див. finish_step.
+def step_objects(store, black_holes, initial_bh_mass, evaporation_rate, disk_band=False, broadphase=None,
+                 extra_force=None, integrator="euler", softening=0.0, events=None):
+    if len(store) == 0:
+        return 0
+    shard = step_shard(store, black_holes, initial_bh_mass, evaporation_rate, disk_band, broadphase,
+                       extra_force, integrator, softening)
+    return finish_step(store, [(0, shard)], black_holes, evaporation_rate, events)
+
+
+# --- КРОК ОДНОГО ШАРДА ---
+# Усе, що залежить лише від самого об'єкта та дір, без випадковості:
+# сили, рух, захоплення, червоніння. fields — будь-що з полями ParticleStore
+# (сам store або зріз спільної пам'яті у воркері), зміни — на місці.
+# Повертає (keep, band, band_d, parents, captured, captured_by, released,
+# released_by) в індексах шарда (*_by — номер діри); випадкові рішення
+# (спалахи в диску, швидкості уламків) приймає finish_step у спільному порядку.
+def step_shard(fields, black_holes, initial_bh_mass, evaporation_rate, disk_band=False, broadphase=None,
+               extra_force=None, integrator="euler", softening=0.0):
+    pos, vel, radius = fields.pos, fields.vel, fields.radius
+    color, initial_color = fields.color, fields.initial_color
+    flags, eaten_timer = fields.flags, fields.eaten_timer
+    n = pos.shape[0]
+
+    m = len(black_holes)
+    active = np.ones(n, dtype=bool)   # ще не спрацював "break" по дірах
+    eaten = np.zeros(n, dtype=bool)
+    keep = np.zeros(n, dtype=bool)
+    big = radius > 5
+    everyone = np.arange(n)
+    captured, captured_by, released, released_by = [], [], [], []
+
+    if broadphase is not None and m:
+        broadphase.build(pos)
+
+    for h, bh in enumerate(black_holes):
+        cx, cy = bh["center"]
+        r = bh["radius"]
+        cand = broadphase.query(bh["center"], r * 1.5) if broadphase is not None else everyone
+        cand = cand[active[cand]]
+        if cand.size == 0:
+            continue
+        d = np.hypot(cx - pos[cand, 0], cy - pos[cand, 1])
+        near = d <= r * 1.5
+        cand, d = cand[near], d[near]
+        in_ring = d > r
+
+        # --- УМОВА 1: КРИТИЧНА ЗОНА (Розділення/Втеча) ---
+        critical, critical_d = cand[in_ring], d[in_ring]
+        broken = big[critical]
+        eaten[critical[broken]] = True
+        active[critical[broken]] = False
+
+        redden = critical[~broken]
+        if redden.size:
+            fade_factor = 1.0 - (critical_d[~broken] - r) / (r * 0.5)
+            c = color[redden].astype(np.float64)
+            c[:, 0] = np.maximum((255 * fade_factor).astype(np.int64), 80)
+            c[:, 1] *= 1.0 - fade_factor * 0.3
+            c[:, 2] *= 1.0 - fade_factor * 0.3
+            color[redden] = c.astype(np.uint8)
+
+        # --- УМОВА 2: ПЕРЕТИН ГОРИЗОНТУ ---
+        horizon = cand[~in_ring]
+        if horizon.size:
+            eaten[horizon] = True
+            first = horizon[(flags[horizon] & FLAG_EATEN) == 0]
+            flags[first] |= FLAG_EATEN
+            eaten_timer[first] = 0
+            initial_color[first] = color[first]
+            captured.append(first)
+            captured_by.append(np.full(first.size, h))
+            eaten_timer[horizon] += 1
+
+            max_fade_frames = 30 / max(0.1, bh["mass"] / initial_bh_mass)
+            finished = eaten_timer[horizon] >= max_fade_frames
+            active[horizon[finished]] = False
+            released.append(horizon[finished])
+            released_by.append(np.full(int(np.count_nonzero(finished)), h))
+
+            fading = horizon[~finished]
+            fade = 1.0 - eaten_timer[fading] / max_fade_frames
+            c = initial_color[fading].astype(np.float64)
+            c[:, 0] = c[:, 0] * fade + 255 * (1 - fade)
+            c[:, 1:] *= (fade * 0.5)[:, None]
+            color[fading] = c.astype(np.uint8)
+            keep[fading] = True
+
+    tiny = radius < 1
+    moving = ~eaten & ~tiny
+    # Поглинуті об'єкти не рухаються, тож сила рахується лише для рухомих
+    step_len = 0.0
+    if moving.any():
+        start = pos[moving]
+        new_pos, vel[moving] = integrate(start.copy(), vel[moving], black_holes, integrator, softening,
+                                         extra_force[moving] if extra_force is not None else None)
+        pos[moving] = new_pos
+        step_len = np.sqrt(np.max(np.einsum("ij,ij->i", new_pos - start, new_pos - start)))
+    radius[moving] -= evaporation_rate
+    keep |= moving
+
+    # --- СМУГА ДИСКА: ХТО В НІЙ ОПИНИВСЯ ---
+    band = band_d = np.empty(0)
+    if disk_band and m:
+        bh = black_holes[0]
+        r1 = bh["radius"] + 40
+        r2 = bh["radius"] + 110
+        if broadphase is not None:
+            # Хеш побудовано до руху: розширюємо запит на найбільше зміщення за крок
+            cand = broadphase.query(bh["center"], r2 + step_len)
+            cand = cand[moving[cand]]
+        else:
+            cand = np.flatnonzero(moving)
+        d = np.hypot(bh["center"][0] - pos[cand, 0], bh["center"][1] - pos[cand, 1])
+        in_band = (r1 < d) & (d < r2)
+        band, band_d = cand[in_band], d[in_band]
+
+    parents = np.flatnonzero(eaten & ~tiny & big)
+    empty = np.empty(0, dtype=np.intp)
+    return (keep, band, band_d, parents, np.concatenate(captured or [empty]),
+            np.concatenate(captured_by or [empty]), np.concatenate(released or [empty]),
+            np.concatenate(released_by or [empty]))
+
+
+# --- ЗЛИВАННЯ ШАРДІВ ---
+# shards — список (зсув, результат step_shard) у порядку зростання зсуву,
+# тож смуга диска й батьки уламків ідуть у тому ж порядку, що й при одному
+# шарді, і випадкові числа тягнуться з np.random однаково для будь-якого
+# поділу. Звідси рівність паралельного й послідовного прогонів. Події
+# захоплення шарди віддають по дірах усередині шарда, тож вони
+# впорядковуються за (діра, рядок) — як в одному шарді, і events.jsonl
+# не залежить від кількості воркерів.
+# Якщо передано events, туди додаються події кадру з номерами частинок (uid):
+#   ("capture_start", {"uid", "hole", "pos", "mass"}) — перший перетин горизонту;
+#   ("capture_end", {"uid"}) — затухання завершилось, частинку прибрано;
+#   ("fragmentation", {"uid", "children"}) — розпад на FRAGMENT_COUNT уламків.
+def finish_step(store, shards, black_holes, evaporation_rate, events=None):
+    keep = np.concatenate([s[0] for _, s in shards])
+    band = np.concatenate([s[1].astype(np.intp) + offset for offset, s in shards])
+    band_d = np.concatenate([s[2] for _, s in shards])
+    parents = np.concatenate([s[3] + offset for offset, s in shards])
+    pos, radius, mass, color, uid = store.pos, store.radius, store.mass, store.color, store.uid
+
+    if events is not None:
+        captured = np.concatenate([s[4] + offset for offset, s in shards])
+        captured_by = np.concatenate([s[5] for _, s in shards])
+        if captured.size:
+            order = np.lexsort((captured, captured_by))
+            captured, captured_by = captured[order], captured_by[order]
+            events.append(("capture_start", {"uid": uid[captured].copy(), "hole": captured_by,
+                                             "pos": pos[captured].copy(), "mass": mass[captured].copy()}))
+        released = np.concatenate([s[6] + offset for offset, s in shards])
+        if released.size:
+            released = released[np.lexsort((released, np.concatenate([s[7] for _, s in shards])))]
+            events.append(("capture_end", {"uid": uid[released].copy()}))
+        parent_uid = uid[parents].copy()
+
+    # --- ВЗАЄМОДІЯ З ДИСКОМ (Яскравість/Темніння) ---
+    if band.size:
+        r1 = black_holes[0]["radius"] + 40
+        r2 = black_holes[0]["radius"] + 110
+        flash = np.random.random(band.size) < 0.3
+        color[band[flash]] = (255, 255, 255)
+        dim = band[~flash]
+        fade = 0.5 + 0.5 * (band_d[~flash] - r1) / (r2 - r1)
+        color[dim] = (color[dim] * fade[:, None]).astype(np.uint8)
+
+    # --- РОЗДІЛЕННЯ НА УЛАМКИ ---
+    # Батьківські рядки можуть бути перезаписані ущільненням, тож їхні
+    # значення зберігаються заздалегідь (по рядку на батька, не на уламок)
+    parent_pos = pos[parents]
+    parent_mass = mass[parents] / 2
+    parent_radius = radius[parents] * 0.4 - evaporation_rate
+    del pos, radius, mass, color, uid
+
+    store.compact(keep)
+    visible = len(store)
+
+    if parents.size:
+        # Уламки одного батька — FRAGMENT_COUNT сусідніх слотів, тож його
+        # значення розносяться трансляцією по осі (батько, уламок)
+        k = parents.size * FRAGMENT_COUNT
+        children = store.allocate(k)
+        store.pos[children].reshape(-1, FRAGMENT_COUNT, 2)[:] = parent_pos[:, None]
+        store.mass[children].reshape(-1, FRAGMENT_COUNT)[:] = parent_mass[:, None]
+        store.radius[children].reshape(-1, FRAGMENT_COUNT)[:] = parent_radius[:, None]
+        store.color[children] = FRAGMENT_COLOR
+        vel = store.vel[children]
+        vel[:] = np.random.randn(k, 2)
+        vel *= 2
+        vel[np.random.random(k) < 0.25] *= 3
+        if events is not None:
+            events.append(("fragmentation", {"uid": parent_uid,
+                                             "children": store.uid[children].reshape(-1, FRAGMENT_COUNT)}))
+
+    return visible
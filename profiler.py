@@ -0,0 +1,157 @@
+import json
+from collections import deque
+from time import perf_counter_ns
+
+import numpy as np
+
+# --- ПОКАДРОВИЙ ПРОФАЙЛЕР ---
+# Заміри етапів головного циклу (perf_counter_ns) і лічильники кадру
+# (об'єкти, діри, злиття, уламки) пишуться в кільцеві буфери фіксованого
+# розміру, тож профайлер можна тримати ввімкненим постійно.
+# Дані живлять HUD (F3) і експорт у Chrome trace JSON (F4,
+# відкривається в chrome://tracing або ui.perfetto.dev).
+HISTORY_FRAMES = 240
+TRACE_EVENTS = 60000
+HUD_COLOR = (200, 255, 200)
+HUD_BACKGROUND = (0, 0, 0, 160)
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, self.start, perf_counter_ns())
+        return False
+
+
+class FrameProfiler:
+    def __init__(self, history=HISTORY_FRAMES, trace_events=TRACE_EVENTS):
+        self.history = history
+        self.frame_index = 0
+        self.show_overlay = False
+        self._stages = {}
+        self._stage_ms = {}
+        self._counters = {}
+        self._frame_counters = {}
+        self._events = deque(maxlen=trace_events)
+        self._origin = perf_counter_ns()
+        self._frame_start = self._origin
+        self._frame_ms = np.zeros(history)
+        self._font = None
+
+    # --- ЗАМІРИ ---
+    def stage(self, name):
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(self, name)
+            self._stage_ms[name] = np.zeros(self.history)
+        return stage
+
+    def _record(self, name, start, end):
+        self._stage_ms[name][self.frame_index % self.history] += (end - start) / 1e6
+        self._events.append(("X", name, start, end - start))
+
+    def count(self, name, value=1):
+        self._frame_counters[name] = self._frame_counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        self._frame_counters[name] = value
+
+    def begin_frame(self):
+        slot = self.frame_index % self.history
+        for samples in self._stage_ms.values():
+            samples[slot] = 0.0
+        for name in self._counters:
+            self._frame_counters.setdefault(name, 0)
+        self._frame_start = perf_counter_ns()
+
+    def end_frame(self):
+        now = perf_counter_ns()
+        slot = self.frame_index % self.history
+        self._frame_ms[slot] = (now - self._frame_start) / 1e6
+        for name, value in self._frame_counters.items():
+            samples = self._counters.get(name)
+            if samples is None:
+                samples = self._counters[name] = np.zeros(self.history)
+            samples[slot] = value
+        self._events.append(("C", "frame", now, dict(self._frame_counters)))
+        self._frame_counters = {}
+        self.frame_index += 1
+
+    # --- ЗВЕДЕННЯ ---
+    def _window(self, samples):
+        n = min(self.frame_index, self.history)
+        return samples[:n] if n < self.history else samples
+
+    def mean_ms(self, name=None):
+        samples = self._frame_ms if name is None else self._stage_ms.get(name)
+        if samples is None or self.frame_index == 0:
+            return 0.0
+        return float(self._window(samples).mean())
+
+    def last(self, name):
+        samples = self._counters.get(name)
+        if samples is None or self.frame_index == 0:
+            return 0
+        return samples[(self.frame_index - 1) % self.history]
+
+    def summary(self):
+        return {
+            "frames": self.frame_index,
+            "frame_ms": self.mean_ms(),
+            "stages_ms": {name: self.mean_ms(name) for name in self._stage_ms},
+            "counters_per_frame": {name: float(self._window(s).mean()) for name, s in self._counters.items()},
+        }
+
+    # --- ЕКСПОРТ У CHROME TRACE ---
+    def export_chrome_trace(self, path):
+        events = []
+        for kind, name, ts, payload in self._events:
+            ts_us = (ts - self._origin) / 1000
+            if kind == "X":
+                events.append({"name": name, "cat": "stage", "ph": "X", "ts": ts_us,
+                               "dur": payload / 1000, "pid": 1, "tid": 1})
+            else:
+                events.append({"name": name, "ph": "C", "ts": ts_us, "pid": 1, "args": payload})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+    # --- HUD ---
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+
+    def draw_overlay(self, surface):
+        if not self.show_overlay:
+            return
+        import pygame   # ядро (world.py) імпортує профайлер без pygame
+        if self._font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._font = pygame.font.Font(None, 20)
+
+        frame_ms = self.mean_ms()
+        lines = [f"кадр {frame_ms:6.2f} мс  ({1000 / frame_ms if frame_ms else 0:5.0f} FPS)"]
+        for name in self._stage_ms:
+            lines.append(f"{name:<12} {self.mean_ms(name):6.2f} мс")
+        lines.append("  ".join(f"{name} {self.last(name):.0f}" for name in self._counters))
+
+        rendered = [self._font.render(line, True, HUD_COLOR) for line in lines]
+        width = max(r.get_width() for r in rendered) + 12
+        height = sum(r.get_height() for r in rendered) + 10
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(HUD_BACKGROUND)
+        y = 5
+        for r in rendered:
+            panel.blit(r, (6, y))
+            y += r.get_height()
+        surface.blit(panel, (8, 8))
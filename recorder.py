@@ -0,0 +1,216 @@
+import glob
+import json
+import os
+import queue
+import threading
+import zipfile
+
+import numpy as np
+
+# --- ЗАПИС ТРАЄКТОРІЙ (ПОТОКОВИЙ, ЧАНКАМИ) ---
+# Кожен every-й крок копіює стан частинок (uid, pos, vel, radius, color) і дір
+# у поточний чанк; повний чанк (chunk_frames кадрів або chunk_rows рядків)
+# іде через обмежену чергу в потік запису і лягає на диск окремим .npz
+# (зі стисненням zlib, якщо compress). Події кадру (захоплення, розпади,
+# злиття дір, спавни) дописуються в events.jsonl тим самим потоком.
+# Якщо черга заповнена (диск не встигає), кадри чанка відкидаються (dropped_chunks),
+# а не гальмує update_objects(); при on_full="block" — чекаємо на запис.
+# Пам'ять обмежена: (queue_chunks + 1) чанків.
+# Помилка запису не зупиняє потік: failed — скільки чанків втрачено, error —
+# остання помилка; pop_error() віддає її один раз, щоб цикл повідомив.
+#
+# settings — {"variant", "params"} світу на початку запису: лягає в meta.json,
+# і офлайн-рендер бере звідти ті самі кольори й розміри (read_meta()).
+#
+# Чанк chunk_NNNNNN.npz:
+#   step (F,), offsets (F+1,) — рядки кадру f: offsets[f]:offsets[f+1]
+#   uid, pos, vel, radius, color — частинки всіх кадрів підряд
+#   bh_offsets (F+1,), bh_center, bh_vel, bh_radius, bh_mass, bh_disk_angle —
+#   так само для дір (кут диска кожної діри; змінюється, лише якщо прогін малювався)
+CHUNK_FRAMES = 64
+CHUNK_ROWS = 1_000_000
+QUEUE_CHUNKS = 4
+COMPRESS_LEVEL = 1   # zlib: найшвидший рівень, для float32 майже той самий розмір
+EVENTS_FILE = "events.jsonl"
+META_FILE = "meta.json"
+
+
+def _jsonable(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class TrajectoryRecorder:
+    def __init__(self, directory, every=1, compress=True, dtype=np.float32, chunk_frames=CHUNK_FRAMES,
+                 chunk_rows=CHUNK_ROWS, queue_chunks=QUEUE_CHUNKS, on_full="drop", settings=None):
+        self.directory = directory
+        self.every = max(1, int(every))
+        self.compress = compress
+        self.dtype = np.dtype(dtype)
+        self.chunk_frames = chunk_frames
+        self.chunk_rows = chunk_rows
+        self.on_full = on_full
+        self.frames = 0
+        self.chunks = 0
+        self.dropped_chunks = 0
+        self.failed = 0
+        self.error = None
+        self._reported = None
+        self._frames = []
+        self._rows = 0
+        self._events = []
+        self._queue = queue.Queue(maxsize=queue_chunks)
+        os.makedirs(directory, exist_ok=True)
+        if settings is not None:
+            with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+                json.dump(settings, f, ensure_ascii=False)
+        self._events_file = open(os.path.join(directory, EVENTS_FILE), "w", encoding="utf-8")
+        self._thread = threading.Thread(target=self._writer, name="trajectory-writer", daemon=True)
+        self._thread.start()
+
+    # --- ПОДІЇ ---
+    # Події не проріджуються: кожна потрапляє в файл з кроком, на якому сталася
+    def event(self, step, kind, **data):
+        record = {"step": int(step), "type": kind}
+        record.update({key: _jsonable(value) for key, value in data.items()})
+        self._events.append(record)
+
+    def events(self, step, frame_events):
+        for kind, data in frame_events:
+            self.event(step, kind, **data)
+
+    # --- КАДРИ ---
+    def record(self, step, store, black_holes):
+        if step % self.every:
+            return False
+        holes = black_holes
+        self._frames.append({
+            "step": step,
+            "uid": store.uid.copy(),
+            "pos": store.pos.astype(self.dtype),
+            "vel": store.vel.astype(self.dtype),
+            "radius": store.radius.astype(self.dtype),
+            "color": store.color.copy(),
+            "bh_center": np.array([bh["center"] for bh in holes], dtype=np.float64).reshape(-1, 2),
+            "bh_vel": np.array([bh["vel"] for bh in holes], dtype=np.float64).reshape(-1, 2),
+            "bh_radius": np.array([bh["radius"] for bh in holes], dtype=np.float64),
+            "bh_mass": np.array([bh["mass"] for bh in holes], dtype=np.float64),
+            "bh_disk_angle": np.array([bh["disk_angle"] for bh in holes], dtype=np.float64),
+        })
+        self.frames += 1
+        self._rows += len(store)
+        if len(self._frames) >= self.chunk_frames or self._rows >= self.chunk_rows:
+            self.flush()
+        return True
+
+    def _pack(self):
+        frames = self._frames
+        chunk = {
+            "step": np.array([f["step"] for f in frames], dtype=np.int64),
+            "offsets": np.concatenate(([0], np.cumsum([len(f["uid"]) for f in frames]))),
+            "bh_offsets": np.concatenate(([0], np.cumsum([len(f["bh_radius"]) for f in frames]))),
+        }
+        for key in ("uid", "pos", "vel", "radius", "color", "bh_center", "bh_vel", "bh_radius", "bh_mass",
+                    "bh_disk_angle"):
+            chunk[key] = np.concatenate([f[key] for f in frames])
+        return chunk
+
+    # block=None — як велить on_full; close() чекає завжди, бо далі все одно
+    # чекає на потік запису, а останній чанк нікуди вже не відкласти
+    def flush(self, block=None):
+        if not self._frames and not self._events:
+            return
+        item = (self.chunks, self._pack() if self._frames else None, self._events)
+        self._frames, self._rows, self._events = [], 0, []
+        if block is None:
+            block = self.on_full == "block"
+        try:
+            self._queue.put(item, block=block)
+        except queue.Full:
+            # Кадри чанка втрачено, але події малі — вони підуть з наступним
+            self.dropped_chunks += 1
+            self._events = item[2] + self._events
+            return
+        self.chunks += 1
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                index, chunk, events = item
+                if chunk is not None:
+                    path = os.path.join(self.directory, f"chunk_{index:06d}.npz")
+                    write_chunk(path, chunk, self.compress)
+                for record in events:
+                    self._events_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._events_file.flush()
+            except Exception as exc:
+                self.failed += 1
+                self.error = exc
+            finally:
+                self._queue.task_done()
+
+    def pop_error(self):
+        error = self.error
+        if error is self._reported:
+            return None
+        self._reported = error
+        return error
+
+    def close(self):
+        self.flush(block=True)
+        self._queue.put(None)
+        self._thread.join()
+        self._events_file.close()
+
+
+# Той самий формат, що й np.savez_compressed (читається np.load), але з
+# вибором рівня стиснення
+def write_chunk(path, chunk, compress=True):
+    mode = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(path, "w", compression=mode, compresslevel=COMPRESS_LEVEL if compress else None) as zf:
+        for key, array in chunk.items():
+            with zf.open(key + ".npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asanyarray(array), allow_pickle=False)
+
+
+# --- ЧИТАННЯ ЗАПИСУ ---
+# Кадри по черзі (dict з тими ж ключами, що й у record), чанк за чанком;
+# chunks — лише ці файли чанків (імена в каталозі), інакше всі
+def read_frames(directory, chunks=None):
+    if chunks is None:
+        paths = sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))
+    else:
+        paths = [os.path.join(directory, name) for name in chunks]
+    for path in paths:
+        with np.load(path) as chunk:
+            data = {key: chunk[key] for key in chunk.files}
+        offsets, bh_offsets = data["offsets"], data["bh_offsets"]
+        for f, step in enumerate(data["step"]):
+            rows = slice(offsets[f], offsets[f + 1])
+            holes = slice(bh_offsets[f], bh_offsets[f + 1])
+            frame = {"step": int(step)}
+            for key in ("uid", "pos", "vel", "radius", "color"):
+                frame[key] = data[key][rows]
+            for key in ("bh_center", "bh_vel", "bh_radius", "bh_mass", "bh_disk_angle"):
+                frame[key] = data[key][holes]
+            yield frame
+
+
+# {} — якщо запис зроблено без метаданих
+def read_meta(directory):
+    path = os.path.join(directory, META_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_events(directory):
+    with open(os.path.join(directory, EVENTS_FILE), encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
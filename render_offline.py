@@ -0,0 +1,214 @@
+import argparse
+import copy
+import glob
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from distortion import LightDistortion
+from rasterizer import Rasterizer
+from config import read_profile
+from recorder import read_frames, read_meta
+from sprites import SpriteCache
+from starfield import StarField
+from world import VARIANTS, World
+
+# --- ОФЛАЙН-РЕНДЕР ЗАПИСАНОГО ПРОГОНУ ---
+# Програє запис recorder.py (headless.py --record DIR) і малює кадри в
+# довільній роздільності тими самими засобами, що й вікно: ореол/ISCO і диск
+# (SpriteCache з масштабом), частинки й рідкі зірки (Rasterizer), вигин світла
+# (LightDistortion з масштабованим радіусом). Світ 900x900 вписується в кадр
+# з полями. Кадри розподіляються між процесами по чанках запису; результат —
+# нумерована послідовність PNG або сирий потік RGB24 (для ffmpeg:
+# -f rawvideo -pix_fmt rgb24 -s WxH -i frames.rgb).
+# Зірки в запис не потрапляють: зоряне тло (StarField) проганяється тут з
+# --seed (зерно сесії) за тими ж параметрами, а кожен чанк отримує копію тла
+# на свій перший крок.
+# Параметри (кольори, розміри дір, диск, зірки) — з meta.json запису, тобто
+# ті, з якими йшов прогін, включно з профілем; --profile може їх переписати.
+# Зміни профілю на льоту під час запису сюди не потрапляють.
+# Якщо прогін був без --render, кути дисків у записі не змінювались — тоді кут
+# кожного диска доінтегровується за масою його діри, як у PygameRenderer.black_holes().
+CONSTANTS = ("SCREEN_SIZE", "CENTER", "BACKGROUND_COLOR", "ISCO_RADIUS_FACTOR", "ISCO_COLOR", "DOPPLER_FACTOR",
+             "GRAVITY_RADIUS", "LIGHT_BEND_INTENSITY", "STAR_COLOR", "STAR_SPAWN_RATE", "MAX_STARS",
+             "STAR_LIFETIME", "STAR_FADE", "STAR_PARALLAX", "DISK_ROTATION_SPEED", "INITIAL_BH_MASS")
+
+_context = None   # (ключ налаштувань, поверхня, спрайти, вигин) у процесі-рендерері
+
+
+# params — параметри світу запису (meta.json) і/або профіль поверх них;
+# пул процесів фізики рендеру не потрібен
+def load_settings(variant, size, distortion_step, params=None):
+    params = {name: value for name, value in (params or {}).items() if name != "PHYSICS_WORKERS"}
+    sim = World(variant, params)
+    settings = {name: getattr(sim, name) for name in CONSTANTS}
+    world_w, world_h = settings["SCREEN_SIZE"]
+    scale = min(size[0] / world_w, size[1] / world_h)
+    settings.update(size=tuple(size), scale=scale, distortion_step=distortion_step,
+                    offset=((size[0] - world_w * scale) / 2, (size[1] - world_h * scale) / 2))
+    return settings
+
+
+# --- ПІДГОТОВКА: ПОРЯДОК КАДРІВ, КУТИ ДИСКІВ, ЗІРКИ ---
+def plan(directory, settings, seed):
+    chunks = sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))
+    steps, holes, first = [], [], []
+    for path in chunks:
+        with np.load(path) as chunk:
+            first.append(sum(len(s) for s in steps))
+            steps.append(chunk["step"])
+            offsets, bh_mass, bh_angle = chunk["bh_offsets"], chunk["bh_mass"], chunk["bh_disk_angle"]
+            holes.extend((bh_mass[o:e], bh_angle[o:e]) for o, e in zip(offsets[:-1], offsets[1:]))
+    if not chunks:
+        return [], [], []
+    steps = np.concatenate(steps)
+    angles = [angle for _, angle in holes]
+
+    # Діра з тим самим номером у сусідніх кадрах вважається тією самою
+    # (після злиття номери наступних зсуваються — їхні диски стрибнуть на кут)
+    if not np.any(np.concatenate(angles)):
+        gaps = np.diff(steps, prepend=steps[0] - 1)
+        running, angles = np.zeros(0), []
+        for (mass, _), gap in zip(holes, gaps):
+            running = np.concatenate((running[:len(mass)], np.zeros(max(0, len(mass) - len(running)))))
+            speed = settings["DISK_ROTATION_SPEED"] * (1 + mass / settings["INITIAL_BH_MASS"] * 0.5)
+            running = (running + speed * gap) % 360
+            angles.append(running)
+
+    # Тло для кадру кроку s — після s + 1 оновлень, як у вікні
+    stars = StarField(settings["MAX_STARS"], settings["SCREEN_SIZE"], settings["STAR_SPAWN_RATE"],
+                      settings["STAR_LIFETIME"], settings["STAR_FADE"], settings["STAR_PARALLAX"], seed)
+    tasks = []
+    for path, start, n in zip(chunks, first, np.diff(first + [len(steps)])):
+        advance_stars(stars, int(steps[start]))
+        tasks.append((path, start, angles[start:start + n], copy.deepcopy(stars)))
+    return tasks, steps, angles
+
+
+def advance_stars(stars, step):
+    while stars.step <= step:
+        stars.update()
+
+
+# --- МАЛЮВАННЯ КАДРУ ---
+def _get_context(settings):
+    global _context
+    key = (settings["size"], settings["scale"], settings["distortion_step"])
+    if _context is None or _context[0] != key:
+        scale = settings["scale"]
+        surface = pygame.Surface(settings["size"])
+        sprites = SpriteCache(settings["ISCO_RADIUS_FACTOR"], settings["ISCO_COLOR"], settings["DOPPLER_FACTOR"],
+                              scale=scale)
+        distortion = LightDistortion(settings["GRAVITY_RADIUS"] * scale, settings["LIGHT_BEND_INTENSITY"],
+                                     settings["distortion_step"])
+        _context = (key, surface, sprites, distortion, Rasterizer())
+    return _context[1:]
+
+
+# disk_angles — кути дисків усіх дір кадру
+def render_frame(frame, disk_angles, stars, settings):
+    surface, sprites, distortion, rasterizer = _get_context(settings)
+    scale = settings["scale"]
+    offset = np.asarray(settings["offset"])
+    surface.fill(settings["BACKGROUND_COLOR"])
+
+    centers = frame["bh_center"] * scale + offset
+    for center, radius, disk_angle in zip(centers, frame["bh_radius"], disk_angles):
+        sprites.blit_hole(surface, center.astype(int), radius, disk_angle)
+
+    rasterizer.particles(surface, frame["pos"] * scale + offset, frame["radius"] * scale, frame["color"])
+
+    advance_stars(stars, int(frame["step"]))
+    shift = frame["bh_center"][0] - settings["CENTER"] if len(frame["bh_center"]) else (0, 0)
+    pos, color = stars.visible(settings["STAR_COLOR"], shift)
+    rasterizer.points(surface, pos * scale + offset, color, max(1, round(scale)))
+
+    distortion.apply(surface, [{"center": c} for c in centers])
+    return surface
+
+
+# --- ЗАВДАННЯ ДЛЯ ПРОЦЕСУ: ОДИН ЧАНК ЗАПИСУ ---
+def render_chunk(path, start, angles, stars, settings, out_dir, raw_path):
+    frames = read_frames(os.path.dirname(path), [os.path.basename(path)])
+    raw = open(raw_path, "wb") if raw_path else None
+    try:
+        for n, frame in enumerate(frames):
+            surface = render_frame(frame, angles[n], stars, settings)
+            if raw:
+                raw.write(pygame.image.tobytes(surface, "RGB"))
+            else:
+                pygame.image.save(surface, os.path.join(out_dir, f"frame_{start + n:06d}.png"))
+    finally:
+        if raw:
+            raw.close()
+    return len(angles)
+
+
+def render(directory, settings, out_dir=None, raw=None, workers=None, seed=0):
+    tasks, steps, _ = plan(directory, settings, seed)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    parts = [f"{raw}.part{i:06d}" if raw else None for i in range(len(tasks))]
+    jobs = [(path, start, angles, stars, settings, out_dir, part)
+            for (path, start, angles, stars), part in zip(tasks, parts)]
+
+    if workers == 0:
+        done = sum(render_chunk(*job) for job in jobs)
+    else:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            done = sum(pool.map(render_chunk, *zip(*jobs))) if jobs else 0
+
+    # Частини сирого потоку склеюються в порядку кадрів
+    if raw:
+        with open(raw, "wb") as out:
+            for part in parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out)
+                os.remove(part)
+    return done
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Офлайн-рендер запису траєкторій у високій роздільності")
+    parser.add_argument("recording", help="каталог запису (headless.py --record)")
+    parser.add_argument("--variant", choices=sorted(VARIANTS),
+                        help="звідки брати кольори й параметри (за замовчуванням — з meta.json запису, інакше main)")
+    parser.add_argument("--profile", help="TOML-профіль поверх параметрів запису (config.py)")
+    parser.add_argument("--profile-name", help="іменований профіль з --profile")
+    parser.add_argument("--size", type=parse_size, default=(3840, 2160), help="роздільність, напр. 3840x2160")
+    parser.add_argument("--out", default="frames", help="каталог для frame_NNNNNN.png")
+    parser.add_argument("--raw", help="замість PNG писати сирий потік RGB24 у цей файл")
+    parser.add_argument("--workers", type=int, help="процеси рендеру (0 = в цьому процесі; за замовчуванням усі ядра)")
+    parser.add_argument("--distortion-step", type=int, default=1, help="крок сітки вигину світла (1 = кожен піксель)")
+    parser.add_argument("--seed", type=int, default=0, help="зерно зоряного тла (зерно сесії)")
+    args = parser.parse_args(argv)
+
+    meta = read_meta(args.recording)
+    params = dict(meta.get("params", {}))
+    if args.profile:
+        params.update(read_profile(args.profile, args.profile_name))
+    settings = load_settings(args.variant or meta.get("variant", "main"), args.size, args.distortion_step, params)
+    start = time.perf_counter()
+    frames = render(args.recording, settings, None if args.raw else args.out, args.raw, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"Кадрів: {frames}, {args.size[0]}x{args.size[1]}, час: {elapsed:.1f} с, "
+          f"{frames / max(elapsed, 1e-9):.2f} кадрів/с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from distortion import LightDistortion
+from rasterizer import Rasterizer
+from sprites import SpriteCache
+
+# --- РЕНДЕРЕРИ СВІТУ ---
+# Renderer — інтерфейс: draw() малює кадр світу (world.py) на поверхню,
+# invalidate() отримує змінені профілем параметри (config.py), щоб рендерер
+# перебудував свої кеші. Світ про рендерер не знає нічого, крім посилання
+# world.renderer, тож фізику можна крутити без жодного рендерера.
+#   steps — скільки кроків фізики минуло з попереднього кадру (обертання
+#           дисків, поява й згасання зірок);
+#   alpha — де між попереднім і поточним кроком фізики малюється кадр
+#           (1 = поточний стан).
+
+
+class Renderer(ABC):
+    @abstractmethod
+    def draw(self, world, surface, steps=1, alpha=1.0):
+        pass
+
+    def invalidate(self, world, changed):
+        pass
+
+
+# --- PYGAME: СПРАЙТИ ДІР, РАСТЕРИЗАТОР, ВИГИН СВІТЛА ---
+# Стадії можна викликати й окремо (headless.py, benchmark.py) — кожна бере
+# інтерполяцію з self.alpha.
+class PygameRenderer(Renderer):
+    def __init__(self, world):
+        self.alpha = 1.0
+        self.rasterizer = Rasterizer()
+        self._light_distortion(world)
+        self._sprite_cache(world)
+
+    def _light_distortion(self, world):
+        self.light_distortion = LightDistortion(world.GRAVITY_RADIUS, world.LIGHT_BEND_INTENSITY,
+                                                world.DISTORTION_STEP)
+
+    def _sprite_cache(self, world):
+        self.sprite_cache = SpriteCache(world.ISCO_RADIUS_FACTOR, world.ISCO_COLOR, world.DOPPLER_FACTOR)
+
+    # (параметри, перебудова): виконується, якщо змінився хоч один з параметрів
+    CACHES = (
+        (("GRAVITY_RADIUS", "LIGHT_BEND_INTENSITY", "DISTORTION_STEP"), _light_distortion),
+        (("ISCO_RADIUS_FACTOR", "ISCO_COLOR", "DOPPLER_FACTOR"), _sprite_cache),
+    )
+
+    def invalidate(self, world, changed):
+        for names, rebuild in self.CACHES:
+            if any(name in changed for name in names):
+                rebuild(self, world)
+
+    # --- ІНТЕРПОЛЯЦІЯ МІЖ КРОКАМИ ФІЗИКИ ---
+    # Світ із рендерером перед кожним кроком зберігає попередні позиції
+    # (world.previous), і проміжна позиція — prev + (pos - prev) * alpha: для
+    # Ейлера, leapfrog і адаптивних підкроків однаково. Частинки зіставляються
+    # за uid; нові (спавни, уламки) попередньої позиції не мають і малюються на
+    # місці, як і нерухомі (захоплені горизонтом) — у них prev == pos.
+    def interpolate(self, pos, previous):
+        if self.alpha >= 1.0 or previous is None:
+            return pos
+        return previous + (pos - previous) * self.alpha
+
+    def previous_positions(self, world, n):
+        if self.alpha >= 1.0 or world.previous is None:
+            return None
+        uid_before, pos_before, _ = world.previous
+        uid, pos = world.objects.uid[:n], world.objects.pos[:n]
+        # Ущільнення переносить лише хвіст у звільнені рядки, тож більшість
+        # частинок лишається в тому ж рядку; сортуються тільки решта
+        m = min(n, uid_before.size)
+        previous = pos.copy()
+        previous[:m] = pos_before[:m]
+        differ = np.flatnonzero(uid[:m] != uid_before[:m])
+        moved = np.concatenate((differ, np.arange(m, n)))
+        previous[moved] = pos[moved]
+        candidates = np.concatenate((differ, np.arange(m, uid_before.size)))
+        if moved.size and candidates.size:
+            candidates = candidates[np.argsort(uid_before[candidates])]
+            rows = candidates[np.minimum(np.searchsorted(uid_before[candidates], uid[moved]), candidates.size - 1)]
+            found = uid_before[rows] == uid[moved]
+            previous[moved[found]] = pos_before[rows[found]]
+        return previous
+
+    def hole_centers(self, world):
+        holes = world.black_holes
+        if self.alpha >= 1.0 or world.previous is None:
+            return [bh["center"] for bh in holes]
+        before = {id(bh): center for bh, center in world.previous[2]}
+        return [self.interpolate(bh["center"], before.get(id(bh))) for bh in holes]
+
+    def draw(self, world, surface, steps=1, alpha=1.0):
+        self.alpha = alpha
+        profiler = world.profiler
+        surface.fill(world.BACKGROUND_COLOR)
+        with profiler.stage("black_holes"):
+            self.black_holes(world, surface, steps)
+        with profiler.stage("particles"):
+            self.particles(world, surface)
+        # СНК: Рідкі зірки
+        with profiler.stage("stars"):
+            self.stars(world, surface, steps)
+        with profiler.stage("distortion"):
+            self.distortion(world, surface)
+
+    # Кожна діра має власний акреційний диск і кут bh["disk_angle"]; діри поза
+    # поверхнею не малюються (кут усе одно обертається), див. SpriteCache.blit_hole
+    def black_holes(self, world, surface, steps=1):
+        culled = static = 0
+        self.sprite_cache.plan_disks([bh["radius"] for bh in world.black_holes])
+        for bh, center in zip(world.black_holes, self.hole_centers(world)):
+            # ЛОГІКА АТС: Швидкість обертання диска залежить від маси діри
+            current_disk_speed = world.DISK_ROTATION_SPEED * (1 + (bh["mass"] / world.INITIAL_BH_MASS) * 0.5)
+
+            # Оновлення кута обертання (за кожен крок фізики з попереднього кадру)
+            bh["disk_angle"] += current_disk_speed * steps
+            if bh["disk_angle"] > 360:
+                bh["disk_angle"] -= 360
+
+            if not self.sprite_cache.blit_hole(surface, center.astype(int), bh["radius"], bh["disk_angle"]):
+                culled += 1
+            elif self.sprite_cache.static_disk(bh["radius"]):
+                static += 1
+        world.profiler.count("culled_holes", culled)
+        world.profiler.count("static_disks", static)
+
+    # Окрема стадія після фізики: усі частинки одним пакетом (rasterizer.py)
+    def particles(self, world, surface):
+        n = world.visible_objects
+        objects = world.objects
+        self.rasterizer.particles(surface, self.interpolate(objects.pos[:n], self.previous_positions(world, n)),
+                                  objects.radius[:n], objects.color[:n])
+
+    # --- ФУНКЦІЯ СНК: РІДКІСНІ ШУМИ ---
+    def stars(self, world, surface, steps=1):
+        star_field = world.star_field
+        for _ in range(steps):
+            star_field.update()
+        # Паралакс: тло зсувається за відхиленням першої діри від центру
+        centers = self.hole_centers(world)
+        shift = centers[0] - world.CENTER if centers else (0, 0)
+        pos, color = star_field.visible(world.STAR_COLOR, shift)
+        # Усі живі зірки — одним записом у пікселі поверхні
+        self.rasterizer.points(surface, pos, color)
+
+    def distortion(self, world, surface):
+        self.light_distortion.apply(surface, [{"center": center} for center in self.hole_centers(world)])
@@ -0,0 +1,151 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+# headless.py під час імпорту вмикає "dummy"-відео; для --play потрібне справжнє
+_VIDEO_DRIVER = os.environ.get("SDL_VIDEODRIVER")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import headless
+from checkpoint import SUFFIX, load_checkpoint, read_state, save_checkpoint
+from config import apply_profile
+from session import read_log, seed_session
+
+# --- ВІДТВОРЕННЯ СЕСІЇ З ЖУРНАЛУ ВВОДУ ---
+# Журнал (session.py) містить зерно і спавни з номером кроку; стан "на кроці N"
+# — після N кроків фізики, до спавнів кроку N. Відтворення:
+#   * перемотка — кроки без рендерингу, так швидко, як дозволяє процесор;
+#   * --seek N — найближчий знімок з кроком <= N з --checkpoints (автознімки
+#     AUTO_CHECKPOINT_STEPS / headless --checkpoint-every), далі дорахунок до N;
+#     каталог спільний для всіх сесій, тож беруться лише знімки з номером
+#     сесії з журналу (і тим самим зерном і варіантом); журнал без номера
+#     (старіший) знімків не використовує;
+#   * --play — після перемотки показати решту сесії у вікні з рендерингом.
+# Якщо в журналі є відновлення знімка (F9), seek іде від початку сесії.
+
+
+def find_checkpoint(directory, step, header):
+    best = None
+    if not header.get("session"):
+        return None
+    for path in glob.glob(os.path.join(directory, f"*{SUFFIX}")):
+        try:
+            meta = read_state(path)["meta"]
+        except ValueError:
+            continue
+        if (meta.get("session") != header["session"] or meta.get("seed") != header["seed"]
+                or meta["variant"] != header["variant"]):
+            continue
+        saved = meta["step"]
+        if saved <= step and (best is None or saved > best[0]):
+            best = (saved, path)
+    return best[1] if best else None
+
+
+# Кроки до target (але не далі until); False — якщо зупинились на until
+def advance(sim, target, until=None, render=False, on_step=None):
+    if until is not None:
+        target = min(target, until)
+    while sim.step_count < target:
+        headless.step(sim, render)
+        if on_step is not None and on_step(sim) is False:
+            return False
+    return until is None or sim.step_count < until
+
+
+# Зміни профілю — це стан, а не подія: пропущені (до знімка, з якого почали)
+# теж застосовуються, інакше параметри розійдуться з живою сесією
+def replay(sim, records, until=None, render=False, on_step=None):
+    for record in records:
+        if record["step"] < sim.step_count:
+            if record.get("type") == "profile":
+                apply_profile(sim, record["values"])
+            continue
+        if not advance(sim, record["step"], until, render, on_step):
+            return sim
+        if record.get("type") == "restore":
+            load_checkpoint(record["path"], sim)
+        elif record.get("type") == "profile":
+            apply_profile(sim, record["values"])
+        else:
+            headless.apply_event(sim, record)
+    if until is not None:
+        advance(sim, until, None, render, on_step)
+    return sim
+
+
+def seek(sim, header, records, step, checkpoints=None):
+    path = None
+    if checkpoints and not any(r.get("type") == "restore" for r in records):
+        path = find_checkpoint(checkpoints, step, header)
+    if path:
+        load_checkpoint(path, sim)
+        sim.session_seed = header["seed"]
+    else:
+        seed_session(sim, header["seed"])
+    sim.session_id = header.get("session")
+    return replay(sim, records, until=step)
+
+
+def play(sim, records):
+    if _VIDEO_DRIVER is None and os.environ.get("SDL_VIDEODRIVER") == "dummy":
+        del os.environ["SDL_VIDEODRIVER"]
+    import pygame   # перемотка й --seek без вікна pygame не імпортують
+    from renderer import PygameRenderer
+    pygame.display.init()
+    sim.screen = pygame.display.set_mode(sim.SCREEN_SIZE)
+    sim.renderer = PygameRenderer(sim)
+    clock = pygame.time.Clock()
+
+    closed = []
+
+    def on_step(sim):
+        pygame.display.flip()
+        clock.tick(sim.PHYSICS_HZ)
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            closed.append(True)
+            return False
+        return True
+
+    # Після кінця журналу симуляція триває, доки вікно не закрито
+    replay(sim, records, render=True, on_step=on_step)
+    while not closed:
+        advance(sim, sim.step_count + 1, render=True, on_step=on_step)
+    pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Відтворення сесії з журналу вводу")
+    parser.add_argument("log", help="журнал сесії (INPUT_LOG, напр. session.jsonl)")
+    parser.add_argument("--seek", type=int, help="перейти до кроку N (без рендерингу)")
+    parser.add_argument("--checkpoints", help="каталог знімків для швидкого seek")
+    parser.add_argument("--until", type=int, help="перемотати до кроку N (за замовчуванням — до останнього спавну)")
+    parser.add_argument("--play", action="store_true", help="після перемотки показувати у вікні")
+    parser.add_argument("--save", help="зберегти знімок стану в кінці")
+    args = parser.parse_args(argv)
+
+    header, records = read_log(args.log)
+    sim = headless.load_simulation(header["variant"])
+
+    start = time.perf_counter()
+    if args.seek is not None:
+        seek(sim, header, records, args.seek, args.checkpoints)
+    else:
+        seed_session(sim, header["seed"])
+        sim.session_id = header.get("session")
+        if not args.play:
+            replay(sim, records, args.until)
+    elapsed = time.perf_counter() - start
+    print(f"Крок: {sim.step_count}, час: {elapsed:.2f} с, об'єктів: {len(sim.objects)}, дір: {len(sim.black_holes)}")
+
+    if args.save:
+        save_checkpoint(args.save, sim)
+    if args.play:
+        play(sim, records)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import json
+import os
+import random
+import shutil
+import uuid
+
+import numpy as np
+
+from checkpoint import SUFFIX
+
+# --- ЖУРНАЛ ВВОДУ СЕСІЇ (EVENT SOURCING) ---
+# Стан симуляції повністю визначається зерном і послідовністю спавнів, тож
+# замість кадрів пишеться лише ввід. JSON Lines:
+#   {"type": "session", "version": 1, "variant": "main", "seed": 123456, "session": "9f1c…"}
+#   {"step": 240, "pos": [300, 450], "charge": 800}
+#   {"step": 900, "type": "restore", "path": "session.restore001.bhsnap"}
+#   {"step": 1200, "type": "profile", "values": {"GRAVITY_CONSTANT": 18000.0}}
+# Рядки спавну — той самий формат, що й сценарій headless.py.
+# Зоряне тло має окремий генератор (sim.star_field), тож малювання не
+# зсуває random / np.random фізики: сесію з вікном можна відтворити без
+# рендерингу біт у біт.
+# Відновлений знімок (F9) копіюється поруч із журналом під власним іменем:
+# наступний F5 переписує checkpoint.bhsnap, а запис журналу має й далі
+# вказувати на той стан, що був відновлений.
+# "session" — унікальний номер сесії: той самий пишеться в знімки (checkpoint.py),
+# і replay.py --seek бере лише знімки своєї сесії, навіть коли зерно фіксоване.
+LOG_VERSION = 1
+
+
+def seed_session(sim, seed):
+    sim.session_seed = seed
+    random.seed(seed)
+    np.random.seed(seed)
+    sim.star_field.seed(seed)
+
+
+def new_seed():
+    return random.SystemRandom().randrange(2 ** 32)
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+class InputLog:
+    def __init__(self, path, seed, variant, session_id=None):
+        self.path = path
+        self.restores = 0
+        self._file = open(path, "w", encoding="utf-8")
+        self._write({"type": "session", "version": LOG_VERSION, "variant": variant, "seed": seed,
+                     "session": session_id})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def spawn(self, step, pos, charge):
+        self._write({"step": int(step), "pos": [int(pos[0]), int(pos[1])], "charge": float(charge)})
+
+    def restore(self, step, path):
+        self.restores += 1
+        copy = f"{os.path.splitext(self.path)[0]}.restore{self.restores:03d}{SUFFIX}"
+        shutil.copyfile(path, copy)
+        self._write({"step": int(step), "type": "restore", "path": copy})
+
+    # Гаряче оновлення профілю (config.py): лише змінені параметри
+    def profile(self, step, values):
+        self._write({"step": int(step), "type": "profile", "values": values})
+
+    def close(self):
+        self._file.close()
+
+
+def read_log(path):
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records or records[0].get("type") != "session":
+        raise ValueError(f"{path}: немає заголовка сесії")
+    header = records[0]
+    if header["version"] != LOG_VERSION:
+        raise ValueError(f"{path}: версія журналу {header['version']}, очікується {LOG_VERSION}")
+    return header, records[1:]
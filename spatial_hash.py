@@ -0,0 +1,61 @@
+import numpy as np
+
+# --- ПРОСТОРОВИЙ ХЕШ (BROADPHASE) ---
+# Рівномірна сітка з клітинок cell_size x cell_size. Об'єкти сортуються
+# за ключем клітинки, тож кожен рядок сітки — суцільний відрізок у
+# відсортованому порядку, і запит кола зводиться до кількох searchsorted.
+# Об'єкти, що вилетіли за межі сітки, притискаються до крайніх клітинок:
+# вони лишаються кандидатами для країв, а точний тест відсіює зайве. Запит
+# кола, що вийшло за межі, так само притискається до країв.
+CELL_SIZE = 32
+GRID_MARGIN = 900
+
+
+class SpatialHash:
+    def __init__(self, width, height, cell_size=CELL_SIZE, margin=GRID_MARGIN):
+        self.cell_size = cell_size
+        self.origin = np.array([-margin, -margin], dtype=np.float64)
+        self.cols = int(np.ceil((width + 2 * margin) / cell_size))
+        self.rows = int(np.ceil((height + 2 * margin) / cell_size))
+        # До 65535 клітинок ключ вміщується в uint16, і стабільне сортування
+        # NumPy стає радиксним (лінійним) замість timsort
+        self.key_dtype = np.uint16 if self.cols * self.rows <= np.iinfo(np.uint16).max else np.int64
+        self.order = np.empty(0, dtype=np.intp)
+        self.sorted_keys = np.empty(0, dtype=self.key_dtype)
+
+    # У воркери передається лише геометрія сітки, без останньої побудови
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["order"] = np.empty(0, dtype=np.intp)
+        state["sorted_keys"] = np.empty(0, dtype=self.key_dtype)
+        return state
+
+    def _cells(self, pos):
+        cells = np.floor((pos - self.origin) / self.cell_size).astype(np.int64)
+        np.clip(cells[:, 0], 0, self.cols - 1, out=cells[:, 0])
+        np.clip(cells[:, 1], 0, self.rows - 1, out=cells[:, 1])
+        return cells
+
+    def build(self, pos):
+        cells = self._cells(pos)
+        keys = (cells[:, 1] * self.cols + cells[:, 0]).astype(self.key_dtype)
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+        return self
+
+    # Індекси всіх об'єктів у клітинках, що перекривають коло (center, radius)
+    def query(self, center, radius):
+        lo = np.floor((np.asarray(center) - radius - self.origin) / self.cell_size).astype(np.int64)
+        hi = np.floor((np.asarray(center) + radius - self.origin) / self.cell_size).astype(np.int64)
+        # Коло за межами сітки притискається до крайніх клітинок так само, як
+        # об'єкти в _cells(): інакше далека діра не бачила б жодного кандидата
+        x0, x1 = np.clip((lo[0], hi[0]), 0, self.cols - 1)
+        y0, y1 = np.clip((lo[1], hi[1]), 0, self.rows - 1)
+
+        rows = (np.arange(y0, y1 + 1, dtype=np.int64) * self.cols).astype(self.key_dtype)
+        starts = np.searchsorted(self.sorted_keys, rows + x0, side="left")
+        ends = np.searchsorted(self.sorted_keys, rows + x1, side="right")
+        spans = [self.order[s:e] for s, e in zip(starts, ends) if e > s]
+        if not spans:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(spans))
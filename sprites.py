@@ -0,0 +1,226 @@
+import math
+from collections import OrderedDict
+from functools import lru_cache
+
+import pygame
+
+# --- КЕШ СПРАЙТІВ ЧОРНИХ ДІР ---
+# Ореол (ISCO-градієнт, горизонт, зовнішнє світіння) залежить лише від радіуса,
+# тому малюється один раз у поверхню з прозорим тлом. Акреційний диск
+# зберігається як набір заздалегідь повернутих кадрів, що вибираються за disk_angle.
+# Ключі містять квантований радіус: після злиття радіус змінюється, і
+# береться (або малюється) новий спрайт, а старий витісняється за LRU.
+# scale — масштаб виводу (офлайн-рендер у високій роздільності): радіуси
+# задаються у світових одиницях, спрайт малюється в scale разів більшим,
+# а кроки градієнтів і товщина ліній підлаштовуються, щоб вигляд не змінювався.
+# Рівень деталізації диска — за його зовнішнім радіусом на екрані
+# ((radius + DISK_OUTER_OFFSET) x scale, px): променів стільки, щоб між
+# сусідніми на краю було ~DISK_SEGMENT_SPACING px (не більше DISK_SEGMENTS x
+# scale, не менше DISK_MIN_SEGMENTS), а диск, менший за DISK_STATIC_RADIUS
+# (прев'ю офлайн-рендеру в малій роздільності), не обертається — один кадр.
+# Кадри обертання ділять DISK_CACHE_SHARE кешу порівну між радіусами дір
+# кадру (plan_disks()): одна-дві діри мають усі disk_frames кадрів, а
+# десятки дір різного радіуса після злиттів — менше (не менше
+# DISK_MIN_FRAMES; великий диск — грубіші кроки), і їхні кадри не
+# витісняють одне одного з кешу. Без plan_disks() (офлайн-рендер, де якість
+# важливіша за пам'ять) кадрів завжди disk_frames.
+RADIUS_QUANTUM = 0.5
+DISK_FRAMES = 120
+DISK_INNER_OFFSET = 40
+DISK_OUTER_OFFSET = 110
+DISK_SEGMENTS = 360
+DISK_SEGMENT_SPACING = 2.5
+DISK_MIN_SEGMENTS = 24
+DISK_STATIC_RADIUS = 40
+DISK_CACHE_SHARE = 0.75
+DISK_MIN_FRAMES = 12
+# Прозорість через colorkey: копіювання непрозорих пікселів без змішування.
+# Пурпуровий ніколи не трапляється в палітрі ореолу й диска (синій канал = 0).
+TRANSPARENT_KEY = (255, 0, 255)
+
+
+# --- СТАТИЧНІ ТАБЛИЦІ (одні на процес) ---
+# Тригонометрія променів диска і кольори градієнтів ореолу не залежать від
+# конкретного SpriteCache, тож новий кеш (зміна профілю, інший рендерер,
+# процес офлайн-рендеру) бере їх готовими. Значення ті самі, що рахувались
+# на місці, — спрайти збігаються піксель у піксель.
+# Промінь диска: (cos, sin, вертикальне викривлення, базова яскравість G)
+@lru_cache(maxsize=1024)
+def disk_rays(segments, disk_angle):
+    rays = []
+    for j in range(segments):
+        angle = math.radians(j * DISK_SEGMENTS / segments + disk_angle)
+        sin_a = math.sin(angle)
+        # Вертикальне викривлення (лінзування)
+        z_factor = 0.3 + 0.7 * abs(sin_a) * 0.5
+        rays.append((math.cos(angle), sin_a, z_factor, max(120, 255 - int(255 * (j / segments)))))
+    return tuple(rays)
+
+
+# Кольори кілець ореолу: ISCO-градієнт (span — ширина зони ISCO) і світіння
+@lru_cache(maxsize=256)
+def halo_gradient(isco_color, span, glow, scale):
+    isco = tuple((int(isco_color[0] * (1 - k / span)), int(isco_color[1] * (1 - k / span)), 0)
+                 for k in range(int(span)))
+    outer = tuple((max(0, int(255 - j * 3 / scale)), max(0, int(140 - j * 2 / scale)), 0) for j in range(glow))
+    return isco, outer
+
+
+class SpriteCache:
+    def __init__(self, isco_radius_factor, isco_color, doppler_factor,
+                 max_bytes=128 * 1024 * 1024, radius_quantum=RADIUS_QUANTUM, disk_frames=DISK_FRAMES, scale=1.0):
+        self.scale = scale
+        self._disk_plan = {}
+        self._disk_radii = None
+        self.isco_radius_factor = isco_radius_factor
+        self.isco_color = isco_color
+        self.doppler_factor = doppler_factor
+        self.max_bytes = max_bytes
+        self.radius_quantum = radius_quantum
+        self.disk_frames = disk_frames
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def quantize(self, radius):
+        return round(radius / self.radius_quantum) * self.radius_quantum
+
+    def invalidate(self, kind=None):
+        if kind is None:
+            self._entries.clear()
+            self._bytes = 0
+            return
+        for key in [k for k in self._entries if k[0] == kind]:
+            surface, _ = self._entries.pop(key)
+            self._bytes -= surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+    def _get(self, key, render):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        entry = render()
+        surface = entry[0]
+        self._bytes += surface.get_bytesize() * surface.get_width() * surface.get_height()
+        self._entries[key] = entry
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (old, _) = self._entries.popitem(last=False)
+            self._bytes -= old.get_bytesize() * old.get_width() * old.get_height()
+        return entry
+
+    def _blank(self, width, height):
+        surface = pygame.Surface((width, height))
+        surface.fill(TRANSPARENT_KEY)
+        surface.set_colorkey(TRANSPARENT_KEY, pygame.RLEACCEL)
+        return surface
+
+    # --- ОРЕОЛ: ISCO/Ергосфера + горизонт + примарний ореол ---
+    # Повертає (поверхня, зсув центру) — блітити в (cx - зсув, cy - зсув).
+    def halo(self, radius):
+        radius = self.quantize(radius)
+        return self._get(("halo", radius), lambda: self._render_halo(radius))
+
+    def _render_halo(self, bh_radius):
+        scale = self.scale
+        bh_radius *= scale
+        glow = int(bh_radius * 1.2)
+        half = int(math.ceil(bh_radius)) + glow + 2
+        surface = self._blank(half * 2, half * 2)
+        center = (half, half)
+
+        isco_radius = bh_radius * self.isco_radius_factor
+        isco, outer = halo_gradient(tuple(self.isco_color), isco_radius - bh_radius, glow, scale)
+        for k, color in enumerate(isco):
+            pygame.draw.circle(surface, color, center, bh_radius + k, 1)
+
+        pygame.draw.circle(surface, (0, 0, 0), center, bh_radius)
+
+        for j, color in enumerate(outer):
+            pygame.draw.circle(surface, color, center, bh_radius + j, 1)
+        return surface, (half, half)
+
+    # --- АКРЕЦІЙНИЙ ДИСК: кадр, найближчий до disk_angle ---
+    # Зовнішній радіус диска на екрані і половина розмірів його спрайта, px
+    def disk_extent(self, radius):
+        r2 = (radius + DISK_OUTER_OFFSET) * self.scale
+        return r2, int(math.ceil(r2)) + 2, int(math.ceil(r2 * 0.65)) + 2
+
+    # Кількість променів для диска діри radius (LOD за зовнішнім радіусом на екрані)
+    def disk_segments(self, radius):
+        r2, _, _ = self.disk_extent(radius)
+        full = int(DISK_SEGMENTS * max(1.0, self.scale))
+        return min(full, max(DISK_MIN_SEGMENTS, math.ceil(2 * math.pi * r2 / DISK_SEGMENT_SPACING)))
+
+    # Замалий на екрані диск не обертається
+    def static_disk(self, radius):
+        return self.disk_extent(self.quantize(radius))[0] < DISK_STATIC_RADIUS
+
+    # Кадри обертання на радіус для дір кадру (спрайт — 4 байти на піксель);
+    # перераховується, лише коли змінився набір радіусів (спавн, злиття)
+    def plan_disks(self, radii):
+        radii = frozenset(self.quantize(r) for r in radii)
+        if radii == self._disk_radii:
+            return
+        self._disk_radii = radii
+        share = self.max_bytes * DISK_CACHE_SHARE / max(1, len(radii))
+        self._disk_plan = {}
+        for radius in radii:
+            _, half_w, half_h = self.disk_extent(radius)
+            fit = int(share // (half_w * half_h * 16))
+            self._disk_plan[radius] = min(self.disk_frames, max(DISK_MIN_FRAMES, fit))
+
+    def disk_frame_count(self, radius):
+        if self.static_disk(radius):
+            return 1
+        return self._disk_plan.get(self.quantize(radius), self.disk_frames)
+
+    def disk(self, radius, disk_angle):
+        radius = self.quantize(radius)
+        frames = self.disk_frame_count(radius)
+        frame = int(disk_angle % 360 / 360 * frames) % frames
+        angle = frame * 360 / frames
+        return self._get(("disk", radius, frames, frame), lambda: self._render_disk(radius, angle))
+
+    def _render_disk(self, bh_radius, disk_angle):
+        scale = self.scale
+        segments = self.disk_segments(bh_radius)
+        r1 = (bh_radius + DISK_INNER_OFFSET) * scale
+        r2, half_w, half_h = self.disk_extent(bh_radius)
+        width = max(1, round(2 * scale))
+        surface = self._blank(half_w * 2, half_h * 2)
+
+        for cos_a, sin_a, z_factor, G in disk_rays(segments, disk_angle):
+            x1 = half_w + cos_a * r1
+            y1 = half_h + sin_a * r1 * z_factor
+            x2 = half_w + cos_a * r2
+            y2 = half_h + sin_a * r2 * z_factor
+
+            # Доплерівське підсилення (асиметрія яскравості)
+            color_boost = 1 + cos_a * self.doppler_factor
+            c = (min(255, int(255 * color_boost)), min(255, int(G * color_boost)), 0)
+            pygame.draw.line(surface, c, (x1, y1), (x2, y2), width)
+        return surface, (half_w, half_h)
+
+    # --- ДІРА НА ПОВЕРХНІ: ореол і диск ---
+    # Половина ширини й висоти спрайтів діри (ті самі розміри, що в _render_*),
+    # px — щоб відсікти діру, не малюючи спрайтів
+    def extent(self, radius):
+        bh_radius = self.quantize(radius) * self.scale
+        halo = int(math.ceil(bh_radius)) + int(bh_radius * 1.2) + 2
+        _, half_w, half_h = self.disk_extent(self.quantize(radius))
+        return max(halo, half_w), max(halo, half_h)
+
+    # center — центр діри на поверхні (цілі px). Діра цілком поза поверхнею не
+    # малюється і спрайтів не створює; повертає, чи намальована
+    def blit_hole(self, surface, center, radius, disk_angle):
+        cx, cy = center
+        half_w, half_h = self.extent(radius)
+        width, height = surface.get_size()
+        if cx + half_w < 0 or cy + half_h < 0 or cx - half_w >= width or cy - half_h >= height:
+            return False
+        # 1-3. ISCO/Ергосфера, горизонт подій і примарний ореол — готовий спрайт
+        halo, (ox, oy) = self.halo(radius)
+        surface.blit(halo, (cx - ox, cy - oy))
+        # 4. Акреційний диск — заздалегідь повернутий кадр для кута цієї діри
+        disk, (ox, oy) = self.disk(radius, disk_angle)
+        surface.blit(disk, (cx - ox, cy - oy))
+        return True
@@ -0,0 +1,85 @@
+import numpy as np
+
+# --- ЗОРЯНЕ ТЛО: КІЛЬЦЕВИЙ БУФЕР ФІКСОВАНОЇ ЄМНОСТІ ---
+# Зірки лежать у масивах (позиція, глибина, крок появи) на capacity слотів.
+# Життя в усіх однакове, тож живі зірки завжди утворюють суцільну дугу кільця
+# від найстарішої до head: застарілі відрізаються з хвоста, нові пишуться в
+# head — без списків і перебудови щокадру.
+#   spawn_rate — середня кількість нових зірок за крок (Пуассон; 0.02 — рідкі,
+#                сотні — щільне тло), поки є вільні слоти;
+#   lifetime   — кроків видимості зірки;
+#   fade       — кроків наростання й згасання яскравості (0 = без мерехтіння);
+#   parallax   — зсув тла за рухом (shift у visible()), далекі зірки (глибина
+#                ближче до 0) зсуваються менше; 0 = вимкнено.
+# Окремий генератор (seed()) не зсуває random / np.random фізики.
+
+
+class StarField:
+    def __init__(self, capacity, size, spawn_rate, lifetime, fade=0, parallax=0.0, seed=None):
+        self.capacity = capacity
+        self.size = np.asarray(size, dtype=np.int64)
+        self.spawn_rate = spawn_rate
+        self.lifetime = lifetime
+        self.fade = fade
+        self.parallax = parallax
+        self.rng = np.random.default_rng(seed)
+        self.pos = np.zeros((capacity, 2), dtype=np.int64)
+        self.depth = np.zeros(capacity, dtype=np.float64)
+        self.born = np.zeros(capacity, dtype=np.int64)
+        self.head = 0
+        self.count = 0
+        self.step = 0
+
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.step = 0
+
+    def __len__(self):
+        return self.count
+
+    # Слоти живих зірок від найстарішої до найновішої
+    def _live(self):
+        return (self.head - self.count + np.arange(self.count)) % self.capacity
+
+    # --- КРОК: ВІДМИРАННЯ І ПОЯВА ---
+    def update(self):
+        self.step += 1
+        if self.count:
+            self.count -= int(np.count_nonzero(self.step - self.born[self._live()] >= self.lifetime))
+        k = min(int(self.rng.poisson(self.spawn_rate)), self.capacity - self.count)
+        if k:
+            slots = (self.head + np.arange(k)) % self.capacity
+            self.pos[slots] = self.rng.integers(0, self.size, (k, 2))
+            self.depth[slots] = self.rng.random(k)
+            self.born[slots] = self.step
+            self.head = (self.head + k) % self.capacity
+            self.count += k
+
+    # --- ВИДИМІ ЗІРКИ ---
+    # Повертає (позиції (n, 2), кольори (n, 3) uint8) для Rasterizer.points;
+    # shift — зсув камери/сцени для паралаксу (у пікселях світу)
+    def visible(self, color, shift=(0, 0)):
+        live = self._live()
+        pos = self.pos[live]
+        if self.parallax:
+            offset = np.asarray(shift, dtype=np.float64) * self.parallax * self.depth[live, None]
+            pos = (pos + offset.astype(np.int64)) % self.size
+        color = np.asarray(color, dtype=np.float64).reshape(1, 3)
+        if self.fade:
+            age = self.step - self.born[live]
+            brightness = np.clip(np.minimum(age + 1, self.lifetime - age) / self.fade, 0.0, 1.0)
+            color = color * brightness[:, None]
+        return pos, np.broadcast_to(color.astype(np.uint8), (len(live), 3))
+
+    # --- СТАН (ЗНІМКИ) ---
+    # arrays — {"pos", "depth", "born"} на всю ємність, meta — {"head", "count", "step"}
+    def load(self, arrays, meta):
+        self.pos = np.array(arrays["pos"], dtype=np.int64).reshape(-1, 2)
+        self.depth = np.array(arrays["depth"], dtype=np.float64)
+        self.born = np.array(arrays["born"], dtype=np.int64)
+        self.capacity = len(self.born)
+        self.head, self.count, self.step = meta["head"], meta["count"], meta["step"]
@@ -0,0 +1,258 @@
+import argparse
+import contextlib
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from config import COLOR, FIELDS, read_profile, validate
+from ensemble import Ensemble
+from headless import load_schedule, load_simulation, run
+from particles import FLAG_EATEN
+from world import VARIANTS, World
+
+# --- ПЕРЕБІР ПАРАМЕТРІВ (ENSEMBLE / SWEEP) ---
+# Сітка параметрів World (імена — як у профілях config.py) x зерна: кожна
+# точка — окремий headless-прогін (без рендерингу) у пулі процесів.
+#   python sweep.py --param GRAVITY_CONSTANT=10000,15000,20000 \
+#       --param BH_SPAWN_SPEED=0.25,0.5,1 --seeds 1 2 3 \
+#       --steps 3000 --schedule spawns.json --output sweep.npz
+# Підсумок прогону збирає RunMetrics — через той самий гачок world.recorder,
+# що й запис траєкторій: моменти злиттів, захоплена горизонтом маса,
+# частинки, що вижили, маси дір наприкінці.
+# Результат — один колонковий .npz (стовпець на метрику й параметр, рядок на
+# прогін; списки змінної довжини — плаский масив + зсуви, як у Arrow):
+#   run_id, seed, param.<ІМ'Я>, merges, first_merge_step, captured_particles,
+#   captured_mass, surviving_particles, final_holes, total_hole_mass, elapsed_s,
+#   merge_step / merge_offset, hole_mass / hole_offset, spec (JSON сітки).
+# Файл переписується атомарно раз на --flush-every секунд і в кінці (зокрема
+# після Ctrl+C); повторний запуск з тією самою сіткою дораховує лише відсутні
+# прогони.
+# --ensemble: усі зерна однієї точки сітки — один векторизований ансамбль
+# (ensemble.py) замість окремих прогонів; для малих сценаріїв це в рази
+# швидше. Випадковість ансамблю інша, ніж у World, тож режим записується в
+# сітку файла і змішувати його з окремими прогонами не можна.
+
+
+class RunMetrics:
+    dropped_chunks = 0
+
+    def __init__(self):
+        self.merge_steps = []
+        self.captured = 0
+        self.captured_mass = 0.0
+
+    def event(self, step, kind, **data):
+        if kind == "merge":
+            self.merge_steps.append(int(step))
+
+    def events(self, step, frame_events):
+        for kind, data in frame_events:
+            if kind == "capture_start":
+                self.captured += len(data["uid"])
+                self.captured_mass += float(np.sum(data["mass"]))
+
+    # Кадри не потрібні — лише події
+    def record(self, step, store, black_holes):
+        return False
+
+    def close(self):
+        pass
+
+    def summary(self, sim):
+        store = sim.objects
+        masses = [float(bh["mass"]) for bh in sim.black_holes]
+        return {
+            "merges": len(self.merge_steps),
+            "first_merge_step": self.merge_steps[0] if self.merge_steps else -1,
+            "merge_steps": self.merge_steps,
+            "captured_particles": self.captured,
+            "captured_mass": self.captured_mass,
+            "surviving_particles": int(np.count_nonzero((store.flags[:len(store)] & FLAG_EATEN) == 0)),
+            "final_holes": len(masses),
+            "total_hole_mass": float(sum(masses)),
+            "hole_masses": masses,
+        }
+
+
+# --- СІТКА ---
+def _parse_value(text):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return {"true": True, "false": False}.get(text.lower(), text)
+
+
+def parse_param(text):
+    name, _, values = text.partition("=")
+    if not values:
+        raise ValueError(f"Очікується ІМ'Я=значення,значення: {text!r}")
+    name = name.strip().upper()
+    if FIELDS.get(name) == COLOR:
+        raise ValueError(f"{name}: кольори не перебираються")
+    return name, [validate(World, {name: _parse_value(v.strip())})[name] for v in values.split(",")]
+
+
+def runs(spec):
+    names = list(spec["grid"])
+    points = itertools.product(*(spec["grid"][name] for name in names))
+    for run_id, (values, seed) in enumerate(itertools.product(points, spec["seeds"])):
+        yield run_id, seed, dict(zip(names, values))
+
+
+# --- ОДИН ПРОГІН (виконується в процесі пулу) ---
+def run_point(spec, run_id, seed, params):
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        sim = load_simulation(spec["variant"], {**spec["base"], **params})
+        metrics = sim.recorder = RunMetrics()
+        start = time.perf_counter()
+        run(sim, spec["steps"], spec["schedule"], seed=seed)
+        elapsed = time.perf_counter() - start
+    return {"run_id": run_id, "seed": seed, "params": params, "elapsed_s": elapsed, **metrics.summary(sim)}
+
+
+def run_points(spec, jobs):
+    return [run_point(spec, *job) for job in jobs]
+
+
+# --- ЗЕРНА ОДНІЄЇ ТОЧКИ ОДНИМ АНСАМБЛЕМ ---
+# jobs — (run_id, зерно, параметри) зі спільними параметрами; elapsed_s — частка
+# всесвіту в часі ансамблю. Всесвіт не залежить від сусідів, тож після
+# відновлення дорахунок частини зерен дає ті самі рядки.
+def run_ensemble(spec, jobs):
+    params = jobs[0][2]
+    ensemble = Ensemble([seed for _, seed, _ in jobs], spec["variant"], {**spec["base"], **params})
+    start = time.perf_counter()
+    run(ensemble, spec["steps"], spec["schedule"])
+    elapsed = (time.perf_counter() - start) / len(jobs)
+    return [{"run_id": run_id, "seed": seed, "params": params, "elapsed_s": elapsed, **ensemble.summary(u)}
+            for u, (run_id, seed, _) in enumerate(jobs)]
+
+
+# --- КОЛОНКОВИЙ ФАЙЛ ---
+SCALARS = ("merges", "first_merge_step", "captured_particles", "captured_mass", "surviving_particles",
+           "final_holes", "total_hole_mass", "elapsed_s")
+RAGGED = (("merge_steps", "merge_step", "merge_offset", np.int64),
+          ("hole_masses", "hole_mass", "hole_offset", np.float64))
+
+
+def write_results(path, spec, rows):
+    rows = sorted(rows, key=lambda row: row["run_id"])
+    columns = {"spec": np.array(json.dumps(spec)),
+               "run_id": np.array([row["run_id"] for row in rows], dtype=np.int64),
+               "seed": np.array([row["seed"] for row in rows], dtype=np.int64)}
+    for name in spec["grid"]:
+        columns[f"param.{name}"] = np.array([row["params"][name] for row in rows])
+    for name in SCALARS:
+        columns[name] = np.array([row[name] for row in rows])
+    for key, flat, offset, dtype in RAGGED:
+        lengths = [len(row[key]) for row in rows]
+        columns[flat] = np.array([v for row in rows for v in row[key]], dtype=dtype)
+        columns[offset] = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **columns)
+    os.replace(tmp, path)
+
+
+# Повертає (spec, рядки) — рядки у тому ж вигляді, що й з run_point()
+def read_results(path):
+    with np.load(path) as data:
+        spec = json.loads(str(data["spec"]))
+        columns = {name: data[name] for name in data.files if name != "spec"}
+    rows = []
+    for i, run_id in enumerate(columns["run_id"].tolist()):
+        row = {"run_id": run_id, "seed": int(columns["seed"][i]),
+               "params": {name: columns[f"param.{name}"][i].item() for name in spec["grid"]}}
+        row.update({name: columns[name][i].item() for name in SCALARS})
+        for key, flat, offset, _ in RAGGED:
+            lo, hi = columns[offset][i], columns[offset][i + 1]
+            row[key] = columns[flat][lo:hi].tolist()
+        rows.append(row)
+    return spec, rows
+
+
+# --- ПЕРЕБІР ---
+def sweep(spec, output, workers=None, flush_every=10.0):
+    rows = []
+    if os.path.exists(output):
+        saved, rows = read_results(output)
+        if saved != json.loads(json.dumps(spec)):
+            raise ValueError(f"{output}: у файлі інша сітка — вкажіть інший --output")
+    done = {row["run_id"] for row in rows}
+    pending = [job for job in runs(spec) if job[0] not in done]
+    # Завдання пулу повертає список рядків: один прогін або цілий ансамбль точки
+    if spec.get("ensemble"):
+        point = lambda job: job[0] // len(spec["seeds"])
+        tasks = [(run_ensemble, (spec, list(jobs))) for _, jobs in itertools.groupby(pending, point)]
+    else:
+        tasks = [(run_points, (spec, [job])) for job in pending]
+
+    flushed = time.monotonic()
+    fresh = 0
+    pool = None
+    interrupted = False
+    try:
+        if workers == 0:
+            results = (task(*args) for task, args in tasks)
+        else:
+            pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            results = (future.result() for future in as_completed([pool.submit(task, *args)
+                                                                    for task, args in tasks]))
+        for batch in results:
+            rows.extend(batch)
+            fresh += len(batch)
+            if time.monotonic() - flushed >= flush_every:
+                write_results(output, spec, rows)
+                flushed = time.monotonic()
+    except KeyboardInterrupt:
+        interrupted = True
+        raise
+    finally:
+        # Спершу готові прогони на диск, потім пул: після Ctrl+C не чекаємо
+        # на прогони, що ще йдуть, — повторний запуск їх дорахує
+        write_results(output, spec, rows)
+        if pool is not None:
+            pool.shutdown(wait=not interrupted, cancel_futures=True)
+    return rows, fresh
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Перебір параметрів симуляції в пулі процесів")
+    parser.add_argument("--param", action="append", default=[], metavar="ІМ'Я=V1,V2,...",
+                        help="параметр World і його значення (можна кілька разів)")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--schedule", help="JSON-сценарій спавну (як у headless.py)")
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default="main")
+    parser.add_argument("--profile", help="TOML-профіль — основа для всіх точок сітки")
+    parser.add_argument("--profile-name", help="іменований профіль з --profile")
+    parser.add_argument("--workers", type=int, help="процеси (0 = в цьому процесі; за замовчуванням усі ядра)")
+    parser.add_argument("--output", default="sweep.npz")
+    parser.add_argument("--flush-every", type=float, default=10.0, help="секунд між проміжними записами файла")
+    parser.add_argument("--ensemble", action="store_true",
+                        help="зерна кожної точки — один векторизований ансамбль (ensemble.py)")
+    args = parser.parse_args(argv)
+
+    grid = dict(parse_param(text) for text in args.param)
+    base = validate(World, read_profile(args.profile, args.profile_name)) if args.profile else {}
+    spec = {"variant": args.variant, "steps": args.steps, "seeds": args.seeds,
+            "schedule": load_schedule(args.schedule), "base": base, "grid": grid, "ensemble": args.ensemble}
+    total = len(args.seeds) * int(np.prod([len(values) for values in grid.values()]))
+
+    start = time.perf_counter()
+    rows, fresh = sweep(spec, args.output, args.workers, args.flush_every)
+    elapsed = time.perf_counter() - start
+    print(f"Прогонів: {len(rows)}/{total} (нових {fresh}), час: {elapsed:.1f} с, результати: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import pygame
+from pygame.locals import *
+
+from checkpoint import AutoCheckpoint, load_checkpoint, save_checkpoint
+from config import ProfileWatcher, current_values
+from recorder import TrajectoryRecorder
+from renderer import PygameRenderer
+from session import InputLog, new_seed, new_session_id, seed_session
+
+# --- ІНТЕРАКТИВНЕ ВІКНО ---
+# Спільний головний цикл для Main.py і main_experimental.py: вікно, ввід миші
+# й клавіш, фіксований крок фізики світу (world.py) і кадр рендерера
+# (renderer.py). Налаштування вікна (файли знімків, журнал, профіль) скрипти
+# передають аргументами, параметри фізики й рендерингу живуть у світі.
+#   F3 — HUD профайлера, F4 — експорт трасування,
+#   F5 — зберегти знімок стану, F9 — відновити.
+
+
+def draw_charge_ring(world, surface, pos):
+    radius = 10 + 40 * min(world.charge_time / world.MAX_CHARGE, 1)
+
+    # ЛОГІКА КІЛЬЦЯ: Зелений, коли готова до спавну ЧД
+    if world.charge_time >= world.MAX_CHARGE + world.MAX_CHARGE_FOR_BH:
+        color = (0, 255, 0)
+    else:
+        color = (80, 120, 255)
+
+    pygame.draw.circle(surface, color, pos, int(radius), 2)
+
+    if world.charge_time > world.MAX_CHARGE:
+        extra_time = world.charge_time - world.MAX_CHARGE
+        bh_radius_indicator = 5 + 15 * min(extra_time / world.MAX_CHARGE_FOR_BH, 1)
+        pygame.draw.circle(surface, (255, 0, 0), pos, int(radius + bh_radius_indicator), 3)
+
+
+# Фонові записи (автознімки, траєкторії) повідомляють про нову помилку один раз
+def report_error(writer, what):
+    error = writer.pop_error()
+    if error:
+        print(f"{what} не записано: {error}")
+
+
+def run(world, trace_file="frame_trace.json", checkpoint_file="checkpoint.bhsnap", checkpoint_dir="checkpoints",
+        auto_checkpoint_steps=0, record_dir=None, record_every=1, input_log="session.jsonl", session_seed=None,
+        profile_file=None, profile_name=None):
+    # Лише відео й події: pygame.init() підняв би ще й аудіо, джойстики тощо
+    # (шрифт HUD профайлер ініціалізує сам при першому F3)
+    pygame.display.init()
+    world.screen = screen = pygame.display.set_mode(world.SCREEN_SIZE)
+    world.renderer = renderer = PygameRenderer(world)
+    profiler = world.profiler
+    clock = pygame.time.Clock()
+    seed = session_seed if session_seed is not None else new_seed()
+    seed_session(world, seed)
+    world.session_id = new_session_id()
+    log = InputLog(input_log, seed, world.variant, world.session_id) if input_log else None
+    auto_checkpoint = AutoCheckpoint(checkpoint_dir, auto_checkpoint_steps) if auto_checkpoint_steps else None
+    profile_watcher = ProfileWatcher(profile_file, profile_name) if profile_file else None
+    # Профіль застосовується ще до запису: його параметри йдуть у метадані запису
+    if profile_watcher:
+        changed = profile_watcher.poll(world)
+        if changed and log:
+            log.profile(world.step_count, changed)
+    if record_dir:
+        world.recorder = TrajectoryRecorder(record_dir, record_every,
+                                            settings={"variant": world.variant, "params": current_values(world)})
+
+    accumulator = 0.0
+    running = True
+    while running:
+        dt = clock.tick(world.FPS)
+        profiler.begin_frame()
+
+        # ГАРЯЧЕ ОНОВЛЕННЯ ПРОФІЛЮ: зміни потрапляють і в журнал для replay.py
+        if profile_watcher:
+            changed = profile_watcher.poll(world)
+            if changed and log:
+                log.profile(world.step_count, changed)
+
+        with profiler.stage("events"):
+            for event in pygame.event.get():
+                if event.type == QUIT:
+                    running = False
+                elif event.type == MOUSEBUTTONDOWN and event.button == 1:
+                    world.charging = True
+                    world.charge_time = 0
+                elif event.type == MOUSEBUTTONUP and event.button == 1:
+                    if world.charging:
+                        if log:
+                            log.spawn(world.step_count, pygame.mouse.get_pos(), world.charge_time)
+                        world.release_charge(pygame.mouse.get_pos(), world.charge_time)
+                    world.charging = False
+                elif event.type == KEYDOWN and event.key == K_F3:
+                    profiler.toggle_overlay()
+                elif event.type == KEYDOWN and event.key == K_F4:
+                    print(f"Трасування збережено: {profiler.export_chrome_trace(trace_file)}")
+                elif event.type == KEYDOWN and event.key == K_F5:
+                    print(f"Знімок збережено: {save_checkpoint(checkpoint_file, world)}")
+                elif event.type == KEYDOWN and event.key == K_F9:
+                    step = world.step_count
+                    try:
+                        load_checkpoint(checkpoint_file, world)
+                    except (OSError, ValueError) as exc:
+                        print(f"Знімок не відновлено: {exc}")
+                    else:
+                        if log:
+                            log.restore(step, checkpoint_file)
+
+        if world.charging:
+            world.charge_time += dt
+
+        # ФІКСОВАНИЙ КРОК ФІЗИКИ: реальний час кадру накопичується і
+        # витрачається кроками по 1/PHYSICS_HZ с — результат не залежить від
+        # того, як швидко машина малює; залишок задає інтерполяцію кадру
+        accumulator += dt
+        step_ms = 1000 / world.PHYSICS_HZ
+        steps = 0
+        with profiler.stage("physics"):
+            while accumulator >= step_ms and steps < world.MAX_PHYSICS_STEPS:
+                world.step()
+                accumulator -= step_ms
+                steps += 1
+        if accumulator >= step_ms:
+            accumulator %= step_ms
+
+        renderer.draw(world, screen, steps, accumulator / step_ms)
+        if world.charging:
+            draw_charge_ring(world, screen, pygame.mouse.get_pos())
+        profiler.draw_overlay(screen)
+
+        with profiler.stage("flip"):
+            pygame.display.flip()
+        # Автознімок у кінці кадру, коли і фізика, і зірки вже зроблені
+        if auto_checkpoint:
+            auto_checkpoint.maybe_save(world)
+            report_error(auto_checkpoint, "Автознімок")
+        if world.recorder:
+            report_error(world.recorder, "Запис траєкторій")
+        profiler.end_frame()
+
+    if auto_checkpoint:
+        auto_checkpoint.close()
+        report_error(auto_checkpoint, "Автознімок")
+    if world.recorder:
+        world.recorder.close()
+        report_error(world.recorder, "Запис траєкторій")
+        if world.recorder.dropped_chunks:
+            print(f"Запис не встигав: відкинуто чанків {world.recorder.dropped_chunks}")
+    if world.parallel_stepper is not None:
+        world.parallel_stepper.close()
+    if log:
+        log.close()
+    pygame.quit()
@@ -0,0 +1,220 @@
+import math
+import random
+
+import numpy as np
+
+from particles import ParticleStore
+from physics import step_objects, step_black_holes, object_gravity
+from spatial_hash import SpatialHash
+from starfield import StarField
+from profiler import FrameProfiler
+from config import validate
+
+# --- ЯДРО СИМУЛЯЦІЇ: СВІТ І КРОК ФІЗИКИ ---
+# World — увесь стан однієї симуляції (частинки, діри, зоряне тло, лічильники)
+# і крок фізики step(). Параметри — атрибути класу з тими самими іменами, що й
+# колись константи скриптів; профілі (config.py) переписують їх на екземплярі.
+# Імпорт модуля не чіпає pygame: ні pygame.init(), ні вікна — малює окремий
+# рендерер (renderer.py), вікно й ввід — window.py, а Main.py і
+# main_experimental.py лише обирають варіант. Пул процесів (parallel.py,
+# multiprocessing) імпортується лише при PHYSICS_WORKERS > 0 — холодний старт
+# пакетного прогону без рендерингу — це по суті лише імпорт numpy.
+# Прапорці варіантів:
+#   disk_band  — взаємодія частинок зі смугою акреційного диска;
+#   log_merges — друкувати кожне злиття дір;
+#   hints      — розгорнуте повідомлення з підказкою при спавні діри.
+VARIANTS = {
+    "main": {"disk_band": True, "log_merges": True, "hints": True},
+    "experimental": {"disk_band": False, "log_merges": False, "hints": False},
+}
+
+
+class World:
+    # --- ПАРАМЕТРИ СИМУЛЯЦІЇ ---
+    SCREEN_SIZE = (900, 900)
+    CENTER = np.array([450, 450])
+    BLACK_HOLE_RADIUS = 60
+    GRAVITY_RADIUS = 300
+    GRAVITY_CONSTANT = 15000
+    LIGHT_BEND_INTENSITY = 1.6
+    DISTORTION_STEP = 8 # Крок сітки вигину світла (1 = повна роздільність)
+    ACCRETION_COLOR = (255, 140, 0)
+    SPHERE_COLOR = (180, 200, 255)
+    # СТРАТЕГІЧНА ЗМІНА: ПОВНИЙ ЧОРНИЙ ФОН
+    BACKGROUND_COLOR = (0, 0, 0)
+    FPS = 60 # Частота кадрів відображення
+    PHYSICS_HZ = 300 # Частота кроків фізики: швидкість симуляції не залежить від FPS і машини
+    MAX_PHYSICS_STEPS = 10 # Найбільше кроків за кадр; більше відставання відкидається (сповільнення замість зависання)
+    EVAPORATION_RATE = 0.02
+
+    # --- НОВІ ПАРАМЕТРИ АТС ---
+    ISCO_RADIUS_FACTOR = 1.6
+    ISCO_COLOR = (255, 69, 0)
+    BH_MASS_MULTIPLIER = 1000
+    DISK_ROTATION_SPEED = 0.3 # Базова швидкість обертання
+    MAX_CHARGE = 1500
+    MAX_CHARGE_FOR_BH = 2000
+    PARTICLE_COUNT_ON_MERGE = 40
+    BH_GRAVITY_FACTOR = 0.000001
+    DOPPLER_FACTOR = 0.5 # НОВИЙ ПАРАМЕТР СНК: Регулює асиметрію яскравості диска
+    BH_THETA = 0.5 # Кут розкриття Барнса-Хата (0 = точний попарний розрахунок)
+    OBJECT_SELF_GRAVITY = False # Взаємне тяжіння звичайних об'єктів
+    OBJECT_GRAVITY_THETA = 1.0
+    OBJECT_GRAVITY_SOFTENING = 5.0
+    INTEGRATOR = "euler" # euler / leapfrog / adaptive (підкроки біля горизонту)
+    FORCE_SOFTENING = 0.0 # Згладжування сили біля центру діри, px
+    PHYSICS_WORKERS = 0 # Процеси для кроку об'єктів (0 = в одному процесі)
+    BH_SPAWN_SPEED = 0.5 # Межа випадкової початкової швидкості нової діри по кожній осі
+    INITIAL_BH_MASS = BLACK_HOLE_RADIUS * BH_MASS_MULTIPLIER
+
+    # --- ПАРАМЕТРИ ДЛЯ ЗІРОК (СНК) ---
+    STAR_SPAWN_RATE = 0.02 # Нових зірок за кадр у середньому (0.02 — рідкі, сотні — щільне тло)
+    MAX_STARS = 200 # Ємність кільцевого буфера зірок
+    STAR_LIFETIME = 150
+    STAR_COLOR = (255, 255, 255)
+    STAR_FADE = 30 # Кадрів наростання й згасання яскравості (0 = без мерехтіння)
+    STAR_PARALLAX = 0.0 # Зсув тла за рухом першої діри (0 = вимкнено, 1 = найближчі зірки разом з нею)
+
+    # params — {параметр: значення} поверх атрибутів класу (як у профілі
+    # config.py), задані ще до створення початкового стану: на відміну від
+    # apply_profile() на готовому світі, вони діють і на першу діру
+    def __init__(self, variant="main", params=None, **features):
+        self._configure(variant, params, features)
+
+        # --- СТАНИ ---
+        self.objects = ParticleStore()
+        self.black_holes = [{
+            "center": self.CENTER.astype(float),
+            "radius": self.BLACK_HOLE_RADIUS,
+            "gravity": self.GRAVITY_CONSTANT,
+            "vel": np.array([0.0, 0.0]),
+            "mass": self.BLACK_HOLE_RADIUS * self.BH_MASS_MULTIPLIER,
+            "disk_angle": 0.0 # Кут акреційного диска (обертає рендерер)
+        }]
+        # Окремий генератор: зірки не зсувають випадковість фізики
+        self.star_field = StarField(self.MAX_STARS, self.SCREEN_SIZE, self.STAR_SPAWN_RATE, self.STAR_LIFETIME,
+                                    self.STAR_FADE, self.STAR_PARALLAX)
+        self.charging = False
+        self.charge_time = 0
+        self.profiler = FrameProfiler()
+        self.broadphase = SpatialHash(*self.SCREEN_SIZE)
+        self.parallel_stepper = None
+        if self.PHYSICS_WORKERS:
+            from parallel import ParallelStepper
+            self.parallel_stepper = ParallelStepper(self.PHYSICS_WORKERS)
+        self.step_count = 0 # Пройдені кроки фізики (знімки стану, запис траєкторій)
+        self.session_seed = None # Зерно сесії (session.py): яка сесія записала знімок
+        self.session_id = None # Унікальний номер сесії (зерно може повторюватись, SESSION_SEED)
+        self.recorder = None
+        self.visible_objects = 0 # Частинки до малювання: без уламків, доданих цим кроком
+        self.previous = None # Стан до останнього кроку для інтерполяції кадру (renderer.py)
+        # Куди й чим малювати (None — світ без зображення: headless, пакетні прогони)
+        self.screen = None
+        self.renderer = None
+
+    # Варіант, прапорці й параметри (спільне з ансамблем, ensemble.py)
+    def _configure(self, variant, params, features):
+        if variant not in VARIANTS:
+            raise ValueError(f"Невідомий варіант симуляції: {variant}")
+        unknown = set(features) - set(VARIANTS[variant])
+        if unknown:
+            raise ValueError(f"Невідомі прапорці: {', '.join(sorted(unknown))}")
+        self.variant = variant
+        flags = {**VARIANTS[variant], **features}
+        self.disk_band = flags["disk_band"]
+        self.log_merges = flags["log_merges"]
+        self.hints = flags["hints"]
+        for name, value in validate(self, params or {}).items():
+            setattr(self, name, value)
+        if params:
+            self.INITIAL_BH_MASS = self.BLACK_HOLE_RADIUS * self.BH_MASS_MULTIPLIER
+
+    # --- СПАВН ОБ'ЄКТІВ ---
+    def spawn_object(self, pos, radius):
+        mass = float(radius * 2)
+        radius_float = float(radius)
+        angle = random.uniform(0, 2 * math.pi)
+        speed = np.array([math.cos(angle), math.sin(angle)]) * random.uniform(1.5, 3.0)
+
+        if radius_float < 15:
+            color = (100, 150, 255)
+        else:
+            color = self.SPHERE_COLOR
+
+        self.objects.append(pos, speed, mass, radius_float, color)
+        if self.recorder:
+            self.recorder.event(self.step_count, "spawn_object", pos=pos, radius=radius_float)
+
+    # --- ВІДПУСКАННЯ ЗАРЯДУ (миша або сценарій headless) ---
+    def release_charge(self, pos, charge):
+        if charge >= self.MAX_CHARGE + self.MAX_CHARGE_FOR_BH:
+            self.spawn_black_hole(pos)
+        elif charge > 0:
+            self.spawn_object(pos, 10 + 40 * min(charge / self.MAX_CHARGE, 1))
+
+    def spawn_black_hole(self, pos):
+        vel_x = random.uniform(-self.BH_SPAWN_SPEED, self.BH_SPAWN_SPEED)
+        vel_y = random.uniform(-self.BH_SPAWN_SPEED, self.BH_SPAWN_SPEED)
+        new_bh = {
+            "center": np.array(pos, dtype=float),
+            "radius": self.BLACK_HOLE_RADIUS * 0.7,
+            "gravity": self.GRAVITY_CONSTANT * 0.8,
+            "vel": np.array([vel_x, vel_y]),
+            "mass": self.BLACK_HOLE_RADIUS * 0.7 * self.BH_MASS_MULTIPLIER,
+            "disk_angle": 0.0
+        }
+        self.black_holes.append(new_bh)
+        if self.recorder:
+            self.recorder.event(self.step_count, "spawn_black_hole", pos=pos, radius=new_bh["radius"])
+        if self.hints:
+            print(f"Нова чорна діра розміщена на {pos}! Кількість дір: {len(self.black_holes)}. "
+                  "Спробуйте запустити її подалі від центру для видимої спіралі.")
+        else:
+            print(f"Нова чорна діра на {pos}. Кількість: {len(self.black_holes)}.")
+
+    # --- КРОК ФІЗИКИ ---
+    def step(self):
+        objects, black_holes, recorder, profiler = self.objects, self.black_holes, self.recorder, self.profiler
+
+        # 0. Попередні позиції — лише коли є рендерер: uid і pos частинок (ущільнення
+        # переставить рядки), діри — разом з їхніми словниками (злиття прибирає діри)
+        if self.renderer is not None:
+            n = len(objects)
+            self.previous = (objects.uid[:n].copy(), objects.pos[:n].copy(),
+                             [(bh, bh["center"].copy()) for bh in black_holes])
+
+        # 1. Взаємодія та рух самих чорних дір (N-тіла): сили через дерево
+        # Барнса-Хата, потім окремий прохід злиттів (SED: мега-спавн частинок)
+        merges = step_black_holes(black_holes, objects, self.GRAVITY_CONSTANT, self.BH_GRAVITY_FACTOR,
+                                  self.BH_MASS_MULTIPLIER, self.BLACK_HOLE_RADIUS, self.PARTICLE_COUNT_ON_MERGE,
+                                  self.BH_THETA, self.INTEGRATOR, self.FORCE_SOFTENING)
+        profiler.count("merges", len(merges))
+        for i, j in merges:
+            if self.log_merges:
+                print(f"ЗЛИТТЯ ЧОРНИХ ДІР: {i} поглинає {j}")
+            if recorder:
+                recorder.event(self.step_count, "merge", hole=i, absorbed=j, ejecta=self.PARTICLE_COUNT_ON_MERGE)
+
+        # 2. Рух звичайних об'єктів; взаємна гравітація вимкнена за замовчуванням
+        extra_force = None
+        if self.OBJECT_SELF_GRAVITY:
+            extra_force = object_gravity(objects, self.GRAVITY_CONSTANT * 0.1 / self.INITIAL_BH_MASS,
+                                         self.OBJECT_GRAVITY_THETA, self.OBJECT_GRAVITY_SOFTENING)
+
+        # Пакетний крок: сила, червоніння, затухання, уламки та взаємодія з диском
+        stepper = self.parallel_stepper.step_objects if self.parallel_stepper else step_objects
+        frame_events = [] if recorder else None
+        visible = stepper(objects, black_holes, self.INITIAL_BH_MASS, self.EVAPORATION_RATE,
+                          disk_band=self.disk_band, broadphase=self.broadphase, extra_force=extra_force,
+                          integrator=self.INTEGRATOR, softening=self.FORCE_SOFTENING, events=frame_events)
+        profiler.count("fragments", len(objects) - visible)
+        profiler.gauge("objects", len(objects))
+        profiler.gauge("black_holes", len(black_holes))
+
+        # Запис траєкторій: події кроку (захоплення, розпади) і стан частинок
+        if recorder:
+            recorder.events(self.step_count, frame_events)
+            recorder.record(self.step_count, objects, black_holes)
+        self.step_count += 1
+        self.visible_objects = visible
+